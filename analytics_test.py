@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""Offline checks for bookkeeper_client.analytics (no server needed)
+
+SalesStore.sync is driven by a fake client whose ``sales.iter_range``
+serves canned sales, so the incremental sync and the numpy helpers can be
+checked without a running stack. Needs pyarrow and numpy.
+"""
+
+import asyncio
+import sys
+import tempfile
+from datetime import date, datetime, timedelta, timezone
+
+from bookkeeper_client.analytics import (
+    SalesStore,
+    item_affinity,
+    item_mix,
+    payment_mix,
+    revenue_by_hour_weekday,
+)
+
+MENU = {
+    "m1": {"name": "Burger", "price": 10.0, "category": {"name": "Food"}},
+    "m2": {"name": "Cola", "price": 2.5, "category": {"name": "Drinks"}},
+    "m3": {"name": "Fries", "price": 4.0, "category": {"name": "Food"}},
+}
+
+
+def sale(sale_id, timestamp, menu_item_id, amount=1, payment_type="CASH", user="admin"):
+    return {
+        "id": sale_id,
+        "menuItemId": menu_item_id,
+        "amount": amount,
+        "paymentType": payment_type,
+        "timestamp": timestamp.isoformat().replace("+00:00", "Z"),
+        "menuItem": MENU[menu_item_id],
+        "user": {"username": user},
+    }
+
+
+class FakeSales:
+    def __init__(self, sales):
+        self.sales = sales
+        self.calls = []
+
+    async def iter_range(self, start, end):
+        self.calls.append((start, end))
+        for item in self.sales:
+            day = datetime.fromisoformat(item["timestamp"].replace("Z", "+00:00")).date()
+            if start <= day <= end:
+                yield item
+
+
+class FakeClient:
+    def __init__(self, sales):
+        self.sales = FakeSales(sales)
+
+
+class AnalyticsTester:
+    def __init__(self):
+        self.tests_run = 0
+        self.tests_passed = 0
+
+    def check(self, name, condition):
+        self.tests_run += 1
+        if condition:
+            self.tests_passed += 1
+            print(f"✅ {name}")
+        else:
+            print(f"❌ {name}")
+        return condition
+
+    def test_incremental_sync(self, directory):
+        d1 = date(2026, 3, 2)  # a Monday
+        at = lambda day, hour, minute=0: datetime(day.year, day.month, day.day, hour, minute, tzinfo=timezone.utc)
+        sales = [
+            sale("s0", at(d1 - timedelta(days=1), 12), "m1"),  # before start
+            sale("s1", at(d1, 12), "m1", amount=2),
+            sale("s2", at(d1, 12, 2), "m2", payment_type="CARD"),
+            sale("s3", at(d1 + timedelta(days=2), 18), "m3"),
+            sale("s4", at(d1 + timedelta(days=3), 19), "m1"),  # after until
+        ]
+        client = FakeClient(sales)
+        store = SalesStore(directory, tz=timezone.utc)
+
+        try:
+            asyncio.run(store.sync(client))
+            self.check("First sync without start is rejected", False)
+        except ValueError:
+            self.check("First sync without start is rejected", True)
+
+        until = d1 + timedelta(days=2)
+        written = asyncio.run(store.sync(client, start=d1, until=until))
+        self.check("First sync writes the sales of start..until", written == 3)
+        self.check(
+            "Empty days are stored and nothing past until is",
+            store.days() == [d1, d1 + timedelta(days=1), until],
+        )
+        self.check("Sale before start is not stored", "s0" not in store.table()["sale_id"].to_pylist())
+
+        calls = len(client.sales.calls)
+        self.check("Sync with nothing new returns 0", asyncio.run(store.sync(client, until=until)) == 0)
+        self.check("Sync with nothing new does not fetch", len(client.sales.calls) == calls)
+
+        written = asyncio.run(store.sync(client, until=d1 + timedelta(days=4)))
+        self.check("Incremental sync writes only the new day's sales", written == 1)
+        self.check(
+            "Incremental sync fetches from the day after the last stored one",
+            client.sales.calls[-1][0] == until,  # one day of overlap before d1 + 3
+        )
+        self.check("All five days are stored", len(store.days()) == 5)
+        self.check(
+            "table() filters by day",
+            store.table(d1, d1)["sale_id"].to_pylist() == ["s1", "s2"],
+        )
+        return store
+
+    def test_analyses(self, store):
+        table = store.table()
+
+        heatmap = revenue_by_hour_weekday(table)
+        self.check("Heatmap is 7 x 24", heatmap.shape == (7, 24))
+        self.check("Heatmap cell holds Monday noon revenue", heatmap[0, 12] == 22.5)
+        self.check("Heatmap sums to total revenue", abs(heatmap.sum() - 36.5) < 1e-9)
+
+        mix = item_mix(table)
+        self.check(
+            "Item mix is ordered by revenue",
+            mix["item"].to_pylist() == ["Burger", "Fries", "Cola"]
+            and mix["amount_sum"].to_pylist() == [3, 1, 1],
+        )
+
+        payments = payment_mix(table, "day")
+        first = payments.slice(0, 1).to_pylist()[0]
+        self.check(
+            "Payment mix splits cash and card per day",
+            first["cash"] == 20.0 and first["card"] == 2.5 and abs(first["cash_share"] - 20 / 22.5) < 1e-9,
+        )
+        weekly = payment_mix(table, "week")
+        self.check("Weekly payment mix buckets by Monday", weekly["period"].to_pylist() == [date(2026, 3, 2)])
+
+        affinity = item_affinity(table, basket_minutes=5)
+        self.check(
+            "Items rung up together form a pair",
+            affinity.num_rows == 1 and {affinity["item_a"][0].as_py(), affinity["item_b"][0].as_py()} == {"Burger", "Cola"},
+        )
+        self.check("Empty table gives no pairs", item_affinity(table.slice(0, 0)).num_rows == 0)
+
+    def run_all_tests(self):
+        print("🚀 Starting analytics tests")
+        with tempfile.TemporaryDirectory() as directory:
+            store = self.test_incremental_sync(directory)
+            self.test_analyses(store)
+        print(f"📊 Tests completed: {self.tests_passed}/{self.tests_run} passed")
+        return self.tests_passed == self.tests_run
+
+
+def main():
+    return 0 if AnalyticsTester().run_all_tests() else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,181 @@
+"""Admission control for the FastAPI proxy
+
+Every /api request is classified into a route class and keyed on the
+authenticated user (plus optional ``X-Device-Id``) rather than the source IP,
+which is always localhost behind the proxy. Each key gets its own token
+bucket per class, and each class has a global concurrency cap with a short,
+bounded wait queue. Requests over the rate are shed with 429, requests that
+cannot get a slot in time with 503. ``POST /api/sales`` has its own class so
+sale entry never queues behind report or dashboard traffic.
+"""
+
+import asyncio
+import os
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+
+from tokens import bearer_token, verify_token
+
+
+@dataclass
+class RouteClass:
+    name: str
+    rate: float  # tokens per second, per client
+    burst: int  # bucket size, per client
+    concurrency: int  # requests in flight across all clients
+    max_queue: int  # requests allowed to wait for a slot
+    queue_timeout: float  # seconds a request may wait for a slot
+
+
+def _env(name, default, cast=float):
+    value = os.environ.get(name)
+    return cast(value) if value else default
+
+
+DEFAULT_CLASSES = {
+    "sales": RouteClass(
+        "sales",
+        rate=_env("ADMISSION_SALES_RATE", 5.0),
+        burst=_env("ADMISSION_SALES_BURST", 30, int),
+        concurrency=_env("ADMISSION_SALES_CONCURRENCY", 32, int),
+        max_queue=_env("ADMISSION_SALES_QUEUE", 128, int),
+        queue_timeout=_env("ADMISSION_SALES_QUEUE_TIMEOUT", 5.0),
+    ),
+    "reports": RouteClass(
+        "reports",
+        rate=_env("ADMISSION_REPORTS_RATE", 0.5),
+        burst=_env("ADMISSION_REPORTS_BURST", 5, int),
+        concurrency=_env("ADMISSION_REPORTS_CONCURRENCY", 2, int),
+        max_queue=_env("ADMISSION_REPORTS_QUEUE", 8, int),
+        queue_timeout=_env("ADMISSION_REPORTS_QUEUE_TIMEOUT", 2.0),
+    ),
+    "default": RouteClass(
+        "default",
+        rate=_env("ADMISSION_DEFAULT_RATE", 5.0),
+        burst=_env("ADMISSION_DEFAULT_BURST", 40, int),
+        concurrency=_env("ADMISSION_DEFAULT_CONCURRENCY", 16, int),
+        max_queue=_env("ADMISSION_DEFAULT_QUEUE", 64, int),
+        queue_timeout=_env("ADMISSION_DEFAULT_QUEUE_TIMEOUT", 2.0),
+    ),
+}
+
+
+class AdmissionRejected(Exception):
+    def __init__(self, status_code, message, retry_after):
+        super().__init__(message)
+        self.status_code = status_code
+        self.message = message
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    __slots__ = ("rate", "burst", "tokens", "updated")
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+
+    def take(self):
+        """Take one token; return 0 on success or the seconds until one is available"""
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0
+        return (1 - self.tokens) / self.rate
+
+
+class _Gate:
+    """Concurrency cap with a bounded number of waiters"""
+
+    def __init__(self, route_class):
+        self.route_class = route_class
+        self.semaphore = asyncio.Semaphore(route_class.concurrency)
+        self.waiting = 0
+
+
+class AdmissionController:
+    BUCKET_IDLE_SECONDS = 600
+    # Sweep early once this many buckets exist
+    MAX_BUCKETS = 10000
+    MAX_DEVICE_ID_LENGTH = 64
+
+    def __init__(self, classes=None):
+        self.classes = classes or DEFAULT_CLASSES
+        self.buckets = {}
+        # Created on first use so the semaphores belong to the server's event loop
+        self.gates = {}
+        self._last_sweep = time.monotonic()
+
+    @staticmethod
+    def classify(method, path):
+        if method == "POST" and path.rstrip("/") == "sales":
+            return "sales"
+        if path.startswith("reports/"):
+            return "reports"
+        return "default"
+
+    @classmethod
+    def client_key(cls, request):
+        """Verified user (and device, if the tablet sends one), else the peer address
+
+        Only a token signed with JWT_SECRET selects a per-user bucket, so
+        made-up tokens cannot mint fresh buckets. Without one, the key is the
+        address of the connected peer; X-Forwarded-For and X-Device-Id are
+        client-controlled and ignored.
+        """
+        claims = verify_token(bearer_token(request))
+        if claims and "userId" in claims:
+            device = request.headers.get("x-device-id", "")[:cls.MAX_DEVICE_ID_LENGTH]
+            return f"user:{claims['userId']}:{device}"
+        return f"addr:{request.client.host if request.client else ''}"
+
+    @asynccontextmanager
+    async def admit(self, request, path):
+        name = self.classify(request.method, path)
+        route_class = self.classes[name]
+
+        self._sweep(force=len(self.buckets) >= self.MAX_BUCKETS)
+        bucket_key = (name, self.client_key(request))
+        bucket = self.buckets.get(bucket_key)
+        if bucket is None:
+            bucket = self.buckets[bucket_key] = TokenBucket(route_class.rate, route_class.burst)
+        wait = bucket.take()
+        if wait:
+            raise AdmissionRejected(429, "Too many requests", wait)
+
+        gate = self.gates.get(name)
+        if gate is None:
+            gate = self.gates[name] = _Gate(route_class)
+        if gate.semaphore.locked():
+            if gate.waiting >= route_class.max_queue:
+                raise AdmissionRejected(503, "Server busy, please retry", route_class.queue_timeout)
+            gate.waiting += 1
+            try:
+                await asyncio.wait_for(gate.semaphore.acquire(), route_class.queue_timeout)
+            except asyncio.TimeoutError:
+                raise AdmissionRejected(503, "Server busy, please retry", route_class.queue_timeout)
+            finally:
+                gate.waiting -= 1
+        else:
+            await gate.semaphore.acquire()
+
+        try:
+            yield name
+        finally:
+            gate.semaphore.release()
+
+    def _sweep(self, force=False):
+        """Forget buckets of clients that have been idle long enough to be full again"""
+        now = time.monotonic()
+        if not force and now - self._last_sweep < self.BUCKET_IDLE_SECONDS:
+            return
+        self._last_sweep = now
+        self.buckets = {
+            key: bucket for key, bucket in self.buckets.items()
+            if now - bucket.updated < self.BUCKET_IDLE_SECONDS
+        }
@@ -0,0 +1,99 @@
+"""Traffic capture for the FastAPI proxy
+
+When ``CAPTURE_FILE`` is set, a sample (``CAPTURE_SAMPLE_RATE``, default all)
+of /api requests is appended to that file as JSON lines: arrival time,
+method, path, query, body, auth/client info, status, duration and the
+response. Authorization headers are never written, and password/token fields
+are redacted from bodies. The file rotates at ``CAPTURE_MAX_BYTES``, keeping
+``CAPTURE_BACKUP_COUNT`` old files. Lines are written from a background
+thread so capture does not block the event loop.
+``backend_replay.py`` plays a capture back against a running stack.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import queue
+import random
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+REDACTED = "[REDACTED]"
+REDACTED_KEYS = {"password", "accesstoken", "refreshtoken", "token", "passwordhash"}
+
+# Larger response bodies are stored as a hash only
+CAPTURE_MAX_RESPONSE_BYTES = 64 * 1024
+
+
+def redact(value):
+    """Copy of a decoded JSON body with credentials replaced"""
+    if isinstance(value, dict):
+        return {
+            key: REDACTED if key.lower() in REDACTED_KEYS else redact(item)
+            for key, item in value.items()
+        }
+    if isinstance(value, list):
+        return [redact(item) for item in value]
+    return value
+
+
+def _decode(content):
+    if not content:
+        return None
+    try:
+        return redact(json.loads(content))
+    except ValueError:
+        return content.decode("utf-8", "replace")
+
+
+class TrafficCapture:
+    def __init__(self, path, sample_rate=1.0, max_bytes=50 * 1024 * 1024, backup_count=5):
+        self.sample_rate = sample_rate
+        handler = RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backup_count)
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        self._queue = queue.SimpleQueue()
+        self._listener = QueueListener(self._queue, handler)
+        self._listener.start()
+
+        self._logger = logging.getLogger(f"traffic-capture:{path}")
+        self._logger.setLevel(logging.INFO)
+        self._logger.propagate = False
+        self._logger.addHandler(QueueHandler(self._queue))
+
+    @classmethod
+    def from_env(cls):
+        path = os.environ.get("CAPTURE_FILE")
+        if not path:
+            return None
+        return cls(
+            path,
+            sample_rate=float(os.environ.get("CAPTURE_SAMPLE_RATE", "1.0")),
+            max_bytes=int(os.environ.get("CAPTURE_MAX_BYTES", str(50 * 1024 * 1024))),
+            backup_count=int(os.environ.get("CAPTURE_BACKUP_COUNT", "5")),
+        )
+
+    def sampled(self):
+        return self.sample_rate >= 1 or random.random() < self.sample_rate
+
+    def record(self, request, path, body, started, duration, status_code, content, client_key):
+        """Queue one captured request/response pair"""
+        entry = {
+            "ts": round(started, 6),
+            "method": request.method,
+            "path": path,
+            "query": request.url.query,
+            "body": _decode(body),
+            "auth": "authorization" in request.headers,
+            # Stable per user/device, without exposing who it was
+            "client": hashlib.sha256(client_key.encode()).hexdigest()[:12],
+            "status": status_code,
+            "duration_ms": round(duration * 1000, 3),
+        }
+        if content is not None and len(content) <= CAPTURE_MAX_RESPONSE_BYTES:
+            entry["response"] = _decode(content)
+        elif content is not None:
+            entry["response_sha256"] = hashlib.sha256(content).hexdigest()
+        self._logger.info(json.dumps(entry, separators=(",", ":"), ensure_ascii=False))
+
+    def close(self):
+        self._listener.stop()
@@ -0,0 +1,241 @@
+"""Native fast path for hot read endpoints
+
+Selected GET routes are answered straight from Postgres (asyncpg pool)
+instead of being proxied to Node. Each handler mirrors the Prisma query and
+the Express handler of the same route, and responses are encoded the way
+``JSON.stringify`` does it, so the body is byte-identical to Node's.
+Routes are enabled one by one through ``NATIVE_ROUTES`` (comma separated,
+e.g. ``sales/today/totals,sessions/active``); everything else still goes
+through Node. So does an enabled route whenever Postgres cannot answer it:
+if the pool failed to open at startup, or a query fails or takes longer than
+``NATIVE_TIMEOUT_SECONDS`` (pool exhausted, connection reset, ...).
+"""
+
+import asyncio
+import json
+import math
+import os
+from datetime import date, datetime, timedelta, timezone
+
+from tokens import bearer_token, verify_token
+
+NATIVE_ROUTES = {
+    route.strip() for route in os.environ.get("NATIVE_ROUTES", "").split(",") if route.strip()
+}
+
+# Longest a native request may take, including the wait for a pooled connection
+NATIVE_TIMEOUT_SECONDS = float(os.environ.get("NATIVE_TIMEOUT_SECONDS", "2"))
+
+JSON_CONTENT_TYPE = "application/json; charset=utf-8"
+
+
+def _js_number(value):
+    """Format a float exactly like JavaScript's Number.prototype.toString"""
+    if math.isnan(value) or math.isinf(value):
+        return "null"
+    if value == 0:
+        return "0"
+    sign = "-" if value < 0 else ""
+    # repr() yields the shortest round-tripping digits, as JS does
+    digits, _, exponent = repr(abs(value)).partition("e")
+    point = digits.index(".") if "." in digits else len(digits)
+    mantissa = digits.replace(".", "")
+    stripped = mantissa.lstrip("0")
+    n = point - (len(mantissa) - len(stripped)) + int(exponent or 0)
+    mantissa = stripped.rstrip("0")
+    k = len(mantissa)
+
+    if k <= n <= 21:
+        return sign + mantissa + "0" * (n - k)
+    if 0 < n <= 21:
+        return sign + mantissa[:n] + "." + mantissa[n:]
+    if -6 < n <= 0:
+        return sign + "0." + "0" * -n + mantissa
+    e = n - 1
+    fraction = "." + mantissa[1:] if k > 1 else ""
+    return f"{sign}{mantissa[0]}{fraction}e{'+' if e >= 0 else '-'}{abs(e)}"
+
+
+def _js_date(value):
+    """Prisma DateTime columns hold UTC; Dates serialise as ISO with milliseconds"""
+    if not isinstance(value, datetime):
+        value = datetime(value.year, value.month, value.day)
+    elif value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return f'"{value.strftime("%Y-%m-%dT%H:%M:%S")}.{value.microsecond // 1000:03d}Z"'
+
+
+def js_dumps(value):
+    """JSON.stringify-compatible encoding (key order preserved, no whitespace)"""
+    if value is None:
+        return "null"
+    if value is True:
+        return "true"
+    if value is False:
+        return "false"
+    if isinstance(value, int):
+        return str(value)
+    if isinstance(value, float):
+        return _js_number(value)
+    if isinstance(value, str):
+        return json.dumps(value, ensure_ascii=False)
+    if isinstance(value, (datetime, date)):
+        return _js_date(value)
+    if isinstance(value, dict):
+        return "{" + ",".join(
+            f"{json.dumps(key, ensure_ascii=False)}:{js_dumps(item)}" for key, item in value.items()
+        ) + "}"
+    if isinstance(value, (list, tuple)):
+        return "[" + ",".join(js_dumps(item) for item in value) + "]"
+    raise TypeError(f"Cannot encode {type(value).__name__}")
+
+
+def _local_midnight_utc():
+    """Node's ``new Date(); setHours(0, 0, 0, 0)`` as a naive UTC datetime"""
+    midnight = datetime.now().astimezone().replace(hour=0, minute=0, second=0, microsecond=0)
+    return midnight.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+class NativeBackend:
+    """asyncpg pool plus the natively served route handlers"""
+
+    def __init__(self, pool, routes, timeout=NATIVE_TIMEOUT_SECONDS):
+        self.pool = pool
+        self.timeout = timeout
+        self.handlers = {
+            route: handler for route, handler in {
+                "sales/today/totals": self.sales_today_totals,
+                "sessions/active": self.sessions_active,
+                "menu/items": self.menu_items,
+            }.items() if route in routes
+        }
+
+    @classmethod
+    async def create(cls, database_url, routes=NATIVE_ROUTES, min_size=2, max_size=10):
+        import asyncpg
+        from urllib.parse import parse_qs, urlsplit, urlunsplit
+
+        # Prisma-specific query parameters (schema, connection_limit, ...) are
+        # not understood by asyncpg; the schema becomes the search_path
+        parts = urlsplit(database_url)
+        schema = parse_qs(parts.query).get("schema", ["public"])[0]
+        pool = await asyncpg.create_pool(
+            urlunsplit(parts._replace(query="")),
+            min_size=min_size,
+            max_size=max_size,
+            server_settings={"search_path": schema},
+            timeout=5,
+        )
+        return cls(pool, routes)
+
+    async def close(self):
+        await self.pool.close()
+
+    async def handle(self, route, request):
+        """(status, body bytes) for a natively served route, or None to let Node answer it"""
+        try:
+            status, payload = await asyncio.wait_for(self._answer(route, request), self.timeout)
+        except Exception as e:
+            print(f"⚠️ Native {route} failed, proxying to Node: {e!r}")
+            return None
+        return status, js_dumps(payload).encode()
+
+    async def _answer(self, route, request):
+        status, payload = await self.authenticate(request)
+        if status == 200:
+            payload = await self.handlers[route]()
+        return status, payload
+
+    async def authenticate(self, request):
+        """Same checks and error bodies as ``authenticateToken`` in src/middleware/auth.ts"""
+        token = bearer_token(request)
+        if not token:
+            return 401, {"error": "Access token required"}
+
+        claims = verify_token(token)
+        if claims is None or "userId" not in claims:
+            return 403, {"error": "Invalid or expired token"}
+
+        # Database errors propagate, so handle() leaves the request to Node
+        user = await self.pool.fetchval('SELECT 1 FROM "users" WHERE "id" = $1', claims["userId"])
+        if not user:
+            return 401, {"error": "User not found"}
+        return 200, None
+
+    async def sales_today_totals(self):
+        today = _local_midnight_utc()
+        # Same statement shape as Prisma's findMany so rows (and the float
+        # summation order) come back in the same order
+        sales = await self.pool.fetch(
+            'SELECT "menu_item_id", "amount", "payment_type" FROM "sales" '
+            'WHERE ("timestamp" >= $1 AND "timestamp" < $2) OFFSET 0',
+            today, today + timedelta(hours=24)
+        )
+        prices = dict(await self.pool.fetch(
+            'SELECT "id", "price" FROM "menu_items" WHERE "id" = ANY($1::text[])',
+            list({sale["menu_item_id"] for sale in sales})
+        ))
+
+        totals = {"overall": 0, "cash": 0, "card": 0, "itemCount": 0}
+        for sale in sales:
+            sale_total = prices[sale["menu_item_id"]] * sale["amount"]
+            totals["overall"] += sale_total
+            totals["itemCount"] += sale["amount"]
+            if sale["payment_type"] == "CASH":
+                totals["cash"] += sale_total
+            else:
+                totals["card"] += sale_total
+        return totals
+
+    async def sessions_active(self):
+        # Prisma sends the local midnight as a date in UTC for @db.Date columns
+        today = _local_midnight_utc().date()
+        session = await self.pool.fetchrow(
+            'SELECT "id", "name", "date", "start_time", "end_time", "is_active", "user_id", "staff_cost" '
+            'FROM "sessions" WHERE ("is_active" = $1 AND "date" >= $2) LIMIT 1 OFFSET 0',
+            True, today
+        )
+        if session is None:
+            return None
+        username = await self.pool.fetchval(
+            'SELECT "username" FROM "users" WHERE "id" = $1', session["user_id"]
+        )
+        return {
+            "id": session["id"],
+            "name": session["name"],
+            "date": session["date"],
+            "startTime": session["start_time"],
+            "endTime": session["end_time"],
+            "isActive": session["is_active"],
+            "userId": session["user_id"],
+            "staffCost": session["staff_cost"],
+            "user": {"username": username},
+        }
+
+    async def menu_items(self):
+        items = await self.pool.fetch(
+            'SELECT "id", "name", "price", "sold_count", "category_id", "is_deleted" '
+            'FROM "menu_items" WHERE ("is_deleted" = $1 AND "category_id" IN '
+            '(SELECT "id" FROM "menu_categories" WHERE "is_deleted" = $2)) '
+            'ORDER BY "name" ASC OFFSET 0',
+            False, False
+        )
+        categories = {
+            row["id"]: {"id": row["id"], "name": row["name"], "isDeleted": row["is_deleted"]}
+            for row in await self.pool.fetch(
+                'SELECT "id", "name", "is_deleted" FROM "menu_categories" WHERE "id" = ANY($1::text[])',
+                list({item["category_id"] for item in items})
+            )
+        }
+        return [
+            {
+                "id": item["id"],
+                "name": item["name"],
+                "price": item["price"],
+                "soldCount": item["sold_count"],
+                "categoryId": item["category_id"],
+                "isDeleted": item["is_deleted"],
+                "category": categories[item["category_id"]],
+            }
+            for item in items
+        ]
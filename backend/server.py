@@ -1,86 +1,278 @@
-from fastapi import FastAPI, HTTPException, Request
-from fastapi.security import HTTPBearer
-from fastapi.middleware.cors import CORSMiddleware
-import uvicorn
+import asyncio
+import os
+import time
+from contextlib import asynccontextmanager
+
 import httpx
+import uvicorn
+from fastapi import FastAPI, HTTPException
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, Response
+from starlette.requests import Request
+
+from admission import AdmissionController, AdmissionRejected
+from native import JSON_CONTENT_TYPE, NATIVE_ROUTES, NativeBackend
 
-app = FastAPI(title="Restaurant Bookkeeping API")
+# Only rarely used pieces are imported on demand: asyncpg when the native
+# pool opens (NativeBackend.create), capture when create_app() builds the app.
 
-# CORS middleware
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+NODE_BACKEND_URL = os.environ.get("NODE_BACKEND_URL", "http://localhost:8002")
+PROXY_PORT = int(os.environ.get("PROXY_PORT", "8001"))
 
-# Security
-security = HTTPBearer()
+# Keep-alive connections to Node opened before the proxy reports ready
+UPSTREAM_POOL_SIZE = int(os.environ.get("UPSTREAM_POOL_SIZE", "20"))
+UPSTREAM_WARM_CONNECTIONS = int(os.environ.get("UPSTREAM_WARM_CONNECTIONS", "4"))
 
-# Node.js subprocess
-node_process = None
+# How long a request keeps retrying while Node is unreachable (e.g. restarting)
+UPSTREAM_CONNECT_RETRY_SECONDS = float(os.environ.get("UPSTREAM_CONNECT_RETRY_SECONDS", "10"))
 
-# Node.js server is managed by supervisor, no need to start it here
-@app.on_event("startup")
-async def startup_event():
+# Seconds /ready answers 503 after SIGTERM while still serving, before the
+# listening sockets close, so the orchestrator stops routing to this process
+SHUTDOWN_DRAIN_SECONDS = float(os.environ.get("SHUTDOWN_DRAIN_SECONDS", "5"))
+
+# Seconds in-flight requests get to finish once the sockets are closed
+GRACEFUL_SHUTDOWN_SECONDS = int(os.environ.get("GRACEFUL_SHUTDOWN_SECONDS", "20"))
+
+# Connection string for the native fast path (see native.py / NATIVE_ROUTES)
+DATABASE_URL = os.environ.get("DATABASE_URL")
+
+
+@asynccontextmanager
+async def lifespan(app):
+    # One pooled client for all upstream calls instead of a new connection per request
+    app.state.upstream = httpx.AsyncClient(
+        base_url=NODE_BACKEND_URL,
+        limits=httpx.Limits(
+            max_connections=UPSTREAM_POOL_SIZE,
+            max_keepalive_connections=UPSTREAM_POOL_SIZE,
+        ),
+        timeout=httpx.Timeout(30.0, connect=5.0),
+    )
+    app.state.ready = False
+    app.state.native = None
+    warm_up_task = asyncio.create_task(warm_up(app))
     print("✅ FastAPI proxy server started")
 
-@app.on_event("shutdown")
-async def shutdown_event():
+    yield
+
+    # Readiness was already withdrawn on SIGTERM (DrainingServer); by now
+    # uvicorn has closed the sockets and waited for in-flight requests
+    warm_up_task.cancel()
     print("🔄 FastAPI proxy server shutting down")
+    await app.state.upstream.aclose()
+    if app.state.native:
+        await app.state.native.close()
+    if app.state.capture:
+        app.state.capture.close()
+
+
+async def warm_up(app):
+    """Wait for Node to answer, open a few pooled connections, then flip readiness"""
+    # Node.js server is managed by supervisor, no need to start it here
+    while True:
+        try:
+            response = await app.state.upstream.get("/api/health", timeout=2.0)
+            if response.status_code == 200:
+                break
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(0.2)
+
+    await asyncio.gather(
+        *(app.state.upstream.get("/api/health") for _ in range(UPSTREAM_WARM_CONNECTIONS)),
+        return_exceptions=True
+    )
+    await start_native(app)
+    app.state.ready = True
+    print("✅ Upstream connection pool warm, proxy ready")
+
+
+async def start_native(app):
+    """Open the Postgres pool for natively served routes; on failure keep proxying them"""
+    if not NATIVE_ROUTES or not DATABASE_URL:
+        return
+    try:
+        app.state.native = await NativeBackend.create(DATABASE_URL, NATIVE_ROUTES)
+        print(f"✅ Native fast path enabled for: {', '.join(sorted(app.state.native.handlers))}")
+    except Exception as e:
+        print(f"⚠️ Native fast path disabled, proxying everything to Node: {e}")
+
+
+def create_app():
+    from capture import TrafficCapture
+
+    app = FastAPI(title="Restaurant Bookkeeping API", lifespan=lifespan)
+
+    # CORS middleware
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["*"],
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+
+    # Per-user token buckets and per-route-class concurrency caps
+    app.state.admission = AdmissionController()
+    # Opt-in request capture for replaying real traffic (see capture.py)
+    app.state.capture = TrafficCapture.from_env()
+    app.state.ready = False
+
+    app.add_api_route("/health", health_check, methods=["GET"])
+    app.add_api_route("/ready", readiness_check, methods=["GET"])
+    # Proxy all API calls to Node.js server
+    app.add_api_route(
+        "/api/{path:path}", proxy_to_node, methods=["GET", "POST", "PUT", "DELETE", "PATCH"]
+    )
+    return app
+
 
 # Health check endpoint
-@app.get("/health")
-async def health_check():
+async def health_check(request: Request):
     """Health check endpoint for container orchestration"""
     try:
         # Check if Node.js backend is responding
-        async with httpx.AsyncClient() as client:
-            response = await client.get("http://localhost:8002/api/health", timeout=5.0)
-            if response.status_code == 200:
-                return {"status": "healthy", "services": {"fastapi": "ok", "nodejs": "ok"}}
-            else:
-                return {"status": "unhealthy", "services": {"fastapi": "ok", "nodejs": "error"}}
+        response = await request.app.state.upstream.get("/api/health", timeout=5.0)
+        if response.status_code == 200:
+            return {"status": "healthy", "services": {"fastapi": "ok", "nodejs": "ok"}}
+        else:
+            return {"status": "unhealthy", "services": {"fastapi": "ok", "nodejs": "error"}}
     except Exception as e:
         return {"status": "unhealthy", "services": {"fastapi": "ok", "nodejs": "error"}, "error": str(e)}
 
-# Proxy all API calls to Node.js server
-@app.api_route("/api/{path:path}", methods=["GET", "POST", "PUT", "DELETE", "PATCH"])
+
+async def readiness_check(request: Request):
+    """200 once the upstream pool is warm, 503 while starting or draining"""
+    if request.app.state.ready:
+        return {"status": "ready"}
+    return JSONResponse(content={"status": "starting"}, status_code=503)
+
+
 async def proxy_to_node(path: str, request: Request):
     """Proxy API calls to Node.js Express server"""
+    capture = request.app.state.capture
+    if not capture or not capture.sampled():
+        return await handle_api_request(path, request)
+
+    # Capture mode (CAPTURE_FILE): record the request, its timing and the response
+    body = await request.body() if request.method != "GET" else None
+    started = time.time()
+    timer = time.perf_counter()
+    status_code, content = 500, None
+    try:
+        response = await handle_api_request(path, request)
+        status_code, content = response.status_code, response.body
+        return response
+    except HTTPException as e:
+        status_code = e.status_code
+        raise
+    finally:
+        capture.record(
+            request, path, body, started, time.perf_counter() - timer, status_code, content,
+            request.app.state.admission.client_key(request)
+        )
+
+
+async def handle_api_request(path: str, request: Request):
+    """Admission control, then the native fast path or Node"""
+    native = getattr(request.app.state, "native", None)
     try:
-        async with httpx.AsyncClient() as client:
-            # Forward the request to Node.js server
-            url = f"http://localhost:8002/api/{path}"
-            
-            # Get request body if it exists
-            body = None
-            if request.method != "GET":
-                body = await request.body()
-            
-            # Forward the request
-            response = await client.request(
+        async with request.app.state.admission.admit(request, path):
+            if native and request.method == "GET" and path in native.handlers:
+                result = await native.handle(path, request)
+                # None: Postgres could not answer, so Node does
+                if result is not None:
+                    status_code, content = result
+                    return Response(
+                        content=content,
+                        status_code=status_code,
+                        headers={"X-Served-By": "native"},
+                        media_type=JSON_CONTENT_TYPE
+                    )
+            return await forward_to_node(path, request)
+    except AdmissionRejected as e:
+        return JSONResponse(
+            content={"error": e.message},
+            status_code=e.status_code,
+            headers={"Retry-After": str(max(1, round(e.retry_after)))}
+        )
+
+
+async def forward_to_node(path: str, request: Request):
+    # Get request body if it exists
+    body = None
+    if request.method != "GET":
+        body = await request.body()
+
+    # Let Node's rate limiter see the real client address
+    headers = dict(request.headers)
+    headers.pop("host", None)
+    if request.client:
+        forwarded = headers.get("x-forwarded-for")
+        headers["x-forwarded-for"] = f"{forwarded}, {request.client.host}" if forwarded else request.client.host
+
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + UPSTREAM_CONNECT_RETRY_SECONDS
+    while True:
+        try:
+            response = await request.app.state.upstream.request(
                 method=request.method,
-                url=url,
-                headers=dict(request.headers),
+                url=f"/api/{path}",
+                headers=headers,
                 content=body,
                 params=request.query_params
             )
-            
-            # Return the response with the correct status code
-            from fastapi.responses import JSONResponse
-            return JSONResponse(
-                content=response.json(),
-                status_code=response.status_code
-            )
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Proxy error: {str(e)}")
+            break
+        except httpx.ConnectError as e:
+            # The request never reached Node (e.g. it is restarting), so it is
+            # safe to retry any method until the deadline
+            if loop.time() >= deadline:
+                raise HTTPException(status_code=503, detail=f"Proxy error: {str(e)}")
+            await asyncio.sleep(0.2)
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Proxy error: {str(e)}")
+
+    # Pass Node's body through untouched instead of decoding and re-encoding it
+    return Response(
+        content=response.content,
+        status_code=response.status_code,
+        media_type=response.headers.get("content-type")
+    )
+
+
+class DrainingServer(uvicorn.Server):
+    """uvicorn server that withdraws readiness before it stops listening
+
+    uvicorn closes its sockets as soon as it sees SIGTERM, and the lifespan
+    shutdown only runs after in-flight requests have finished, so /ready
+    would never answer 503. Here the first SIGTERM/SIGINT flips readiness
+    and the server keeps serving for ``drain_seconds`` before the usual
+    graceful shutdown; a second signal skips the wait.
+    """
+
+    def __init__(self, config, drain_seconds=SHUTDOWN_DRAIN_SECONDS):
+        super().__init__(config)
+        self.drain_seconds = drain_seconds
+        self.drain_deadline = None
+
+    def handle_exit(self, sig, frame):
+        if self.started and self.drain_deadline is None and self.drain_seconds > 0:
+            self.config.app.state.ready = False
+            self.drain_deadline = time.monotonic() + self.drain_seconds
+            print(f"🔄 Not ready, draining for {self.drain_seconds:g}s before shutting down")
+            return
+        super().handle_exit(sig, frame)
+
+    async def on_tick(self, counter):
+        if self.drain_deadline is not None and time.monotonic() >= self.drain_deadline:
+            self.should_exit = True
+        return await super().on_tick(counter)
 
-# Health check endpoint
-@app.get("/health")
-async def health_check():
-    return {"status": "OK", "message": "Restaurant Bookkeeping API is running"}
 
 if __name__ == "__main__":
-    uvicorn.run(app, host="0.0.0.0", port=8001)
\ No newline at end of file
+    DrainingServer(uvicorn.Config(
+        create_app(),
+        host="0.0.0.0",
+        port=PROXY_PORT,
+        timeout_graceful_shutdown=GRACEFUL_SHUTDOWN_SECONDS,
+    )).run()
@@ -0,0 +1,29 @@
+"""Access token checks shared by admission control and the native fast path
+
+Mirrors ``authenticateToken`` in src/middleware/auth.ts: the token is the
+second word of the Authorization header and is signed with ``JWT_SECRET``.
+"""
+
+import os
+
+import jwt
+
+JWT_SECRET = os.environ.get("JWT_SECRET") or "fallback-secret"
+JWT_ALGORITHMS = ["HS256", "HS384", "HS512"]
+
+
+def bearer_token(request):
+    """Token from the Authorization header, split the way Express does it"""
+    authorization = request.headers.get("authorization")
+    parts = authorization.split(" ") if authorization else []
+    return parts[1] if len(parts) > 1 else None
+
+
+def verify_token(token):
+    """Claims of a valid, unexpired access token, else None"""
+    if not token:
+        return None
+    try:
+        return jwt.decode(token, JWT_SECRET, algorithms=JWT_ALGORITHMS)
+    except jwt.PyJWTError:
+        return None
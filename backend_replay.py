@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""Replay a proxy traffic capture against a running stack
+
+Reads the JSON lines written by the proxy in capture mode (``CAPTURE_FILE``,
+see backend/capture.py), including rotated files passed alongside, and
+sends the requests again at their original inter-arrival times (``--speed
+1``), compressed (``--speed 5``) or back to back (``--speed max``, capped
+at the capture's peak concurrency). Requests overlap exactly as they did
+originally, so the concurrency shape is preserved.
+
+Credentials are redacted in captures, so ``auth/*`` requests are skipped and
+the replayer logs in once with its own account; each original client keeps
+its own ``X-Device-Id`` so the proxy's admission buckets see the same spread.
+
+Prints latency percentiles per route next to the captured ones, and lists
+responses whose status or body differ from the capture (ignoring volatile
+keys such as ids and timestamps).
+
+    python backend_replay.py capture.jsonl.2 capture.jsonl.1 capture.jsonl --speed 5
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import re
+import sys
+import time
+from fnmatch import fnmatchcase
+from urllib.parse import parse_qsl
+
+from bookkeeper_client import BookkeeperClient
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend"))
+from capture import redact  # noqa: E402
+
+DEFAULT_IGNORE_KEYS = "id,*Id,timestamp,createdAt,startTime,endTime,date,computedAt"
+
+# cuid / uuid / numeric path segments are folded into ":id" for per-route stats
+ID_SEGMENT = re.compile(r"^(c[a-z0-9]{20,}|[0-9a-f]{8}-[0-9a-f-]{27}|\d+)$")
+
+
+def load_capture(paths):
+    entries = []
+    for path in paths:
+        with open(path) as f:
+            entries.extend(json.loads(line) for line in f if line.strip())
+    entries.sort(key=lambda entry: entry["ts"])
+    return entries
+
+
+def route_of(entry):
+    segments = [":id" if ID_SEGMENT.match(part) else part for part in entry["path"].split("/")]
+    return f"{entry['method']} {'/'.join(segments)}"
+
+
+def peak_concurrency(entries):
+    """Most requests that were in flight at the same time in the capture"""
+    events = []
+    for entry in entries:
+        events.append((entry["ts"], 1))
+        events.append((entry["ts"] + entry["duration_ms"] / 1000, -1))
+    peak = current = 0
+    for _, change in sorted(events):
+        current += change
+        peak = max(peak, current)
+    return max(peak, 1)
+
+
+def percentile(values, q):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(q / 100 * (len(values) - 1))))]
+
+
+def first_difference(expected, actual, ignore, where="$"):
+    """JSON path and values of the first difference, or None if equal"""
+    if isinstance(expected, dict) and isinstance(actual, dict):
+        for key in sorted(set(expected) | set(actual)):
+            if any(fnmatchcase(key, pattern) for pattern in ignore):
+                continue
+            if key not in expected or key not in actual:
+                return f"{where}.{key}: only in {'replay' if key in actual else 'capture'}"
+            difference = first_difference(expected[key], actual[key], ignore, f"{where}.{key}")
+            if difference:
+                return difference
+        return None
+    if isinstance(expected, list) and isinstance(actual, list):
+        if len(expected) != len(actual):
+            return f"{where}: {len(expected)} items != {len(actual)} items"
+        for index, (left, right) in enumerate(zip(expected, actual)):
+            difference = first_difference(left, right, ignore, f"{where}[{index}]")
+            if difference:
+                return difference
+        return None
+    if expected != actual:
+        return f"{where}: {json.dumps(expected)[:80]} != {json.dumps(actual)[:80]}"
+    return None
+
+
+class TrafficReplayer:
+    def __init__(self, base_url, speed=1.0, username="admin", password="password123",
+                 ignore_keys=DEFAULT_IGNORE_KEYS):
+        self.base_url = base_url
+        self.speed = speed  # None replays as fast as the capture's concurrency allows
+        self.username = username
+        self.password = password
+        self.ignore = [key for key in ignore_keys.split(",") if key]
+
+    async def replay(self, entries):
+        peak = peak_concurrency(entries)
+        async with BookkeeperClient(
+            self.base_url,
+            username=self.username,
+            password=self.password,
+            concurrency=peak,
+            max_connections=peak,
+            timeout=60.0,
+        ) as client:
+            gate = asyncio.Semaphore(peak)
+            loop = asyncio.get_running_loop()
+            origin, start = entries[0]["ts"], loop.time()
+
+            async def fire(entry):
+                scheduled = 0.0
+                if self.speed:
+                    scheduled = (entry["ts"] - origin) / self.speed
+                    await asyncio.sleep(max(0.0, start + scheduled - loop.time()))
+                    return await self._send(client, entry, loop.time() - start - scheduled)
+                async with gate:
+                    return await self._send(client, entry, 0.0)
+
+            return await asyncio.gather(*(fire(entry) for entry in entries))
+
+    async def _send(self, client, entry, lag):
+        body = entry.get("body")
+        started = time.perf_counter()
+        try:
+            response = await client.request(
+                entry["method"],
+                entry["path"],
+                json=body if entry["method"] in ("POST", "PUT", "PATCH") and isinstance(body, (dict, list)) else None,
+                params=parse_qsl(entry.get("query", ""), keep_blank_values=True) or None,
+                headers={"X-Device-Id": f"replay-{entry.get('client', '')}"},
+                auth=entry.get("auth", True),
+            )
+        except Exception as e:
+            return {"entry": entry, "latency_ms": None, "lag_ms": lag * 1000, "mismatch": f"error: {e}"}
+        latency = (time.perf_counter() - started) * 1000
+        return {
+            "entry": entry,
+            "latency_ms": latency,
+            "lag_ms": lag * 1000,
+            "mismatch": self.compare(entry, response),
+        }
+
+    def compare(self, entry, response):
+        if response.status_code != entry["status"]:
+            return f"status {entry['status']} != {response.status_code}"
+        if "response_sha256" in entry:
+            if hashlib.sha256(response.content).hexdigest() != entry["response_sha256"]:
+                return "body hash differs"
+            return None
+        if "response" not in entry:
+            return None
+        try:
+            actual = redact(response.json()) if response.content else None
+        except ValueError:
+            actual = response.text
+        return first_difference(entry["response"], actual, self.ignore)
+
+
+def report(results, skipped, speed, elapsed):
+    by_route = {}
+    for result in results:
+        by_route.setdefault(route_of(result["entry"]), []).append(result)
+
+    latencies = [r["latency_ms"] for r in results if r["latency_ms"] is not None]
+    mismatches = [r for r in results if r["mismatch"]]
+    print(f"📼 Replayed {len(results)} requests at {f'{speed:g}x' if speed else 'max speed'} "
+          f"in {elapsed:.1f}s ({skipped} auth requests skipped)")
+    print(f"   max dispatch lag {max((r['lag_ms'] for r in results), default=0):.1f} ms, "
+          f"p50 {percentile(latencies, 50):.1f} ms, p99 {percentile(latencies, 99):.1f} ms")
+    print()
+    print(f"{'route':<40} {'count':>6} {'p50':>8} {'p90':>8} {'p99':>8} {'max':>8} "
+          f"{'cap p50':>8} {'cap p99':>8} {'diffs':>6}")
+    for route, route_results in sorted(by_route.items()):
+        replayed = [r["latency_ms"] for r in route_results if r["latency_ms"] is not None]
+        captured = [r["entry"]["duration_ms"] for r in route_results]
+        print(f"{route[:40]:<40} {len(route_results):>6} "
+              f"{percentile(replayed, 50):>8.1f} {percentile(replayed, 90):>8.1f} "
+              f"{percentile(replayed, 99):>8.1f} {max(replayed, default=0):>8.1f} "
+              f"{percentile(captured, 50):>8.1f} {percentile(captured, 99):>8.1f} "
+              f"{sum(1 for r in route_results if r['mismatch']):>6}")
+
+    if mismatches:
+        origin = results[0]["entry"]["ts"]
+        print()
+        print(f"❌ {len(mismatches)} responses differ from the capture:")
+        for result in mismatches[:20]:
+            entry = result["entry"]
+            print(f"   {route_of(entry)} @ {entry['ts'] - origin:.2f}s: {result['mismatch']}")
+    else:
+        print()
+        print("✅ All responses match the capture")
+    return not mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a proxy traffic capture")
+    parser.add_argument("files", nargs="+", help="capture files (rotated files may be listed too)")
+    parser.add_argument("--base-url", default="http://localhost:8001")
+    parser.add_argument("--speed", default="1", help="time compression: 1, 5, ... or 'max'")
+    parser.add_argument("--username", default="admin")
+    parser.add_argument("--password", default="password123")
+    parser.add_argument("--ignore-keys", default=DEFAULT_IGNORE_KEYS,
+                        help="comma separated key patterns excluded from response diffs")
+    args = parser.parse_args()
+
+    entries = load_capture(args.files)
+    replayable = [entry for entry in entries if not entry["path"].startswith("auth/")]
+    if not replayable:
+        print("❌ Nothing to replay")
+        return 1
+
+    speed = None if args.speed == "max" else float(args.speed)
+    replayer = TrafficReplayer(args.base_url, speed, args.username, args.password, args.ignore_keys)
+    started = time.perf_counter()
+    results = asyncio.run(replayer.replay(replayable))
+    success = report(results, len(entries) - len(replayable), speed, time.perf_counter() - started)
+    return 0 if success else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,19 +1,39 @@
 #!/usr/bin/env python3
 
-import requests
+import asyncio
+import base64
 import json
+import os
+import socket
+import subprocess
 import sys
+import tempfile
 import time
 from datetime import datetime
 
+import httpx
+
+from bookkeeper_client import BookkeeperClient
+
 class RestaurantAPITester:
     def __init__(self, base_url="http://localhost:8001"):
         self.base_url = base_url
-        self.token = None
         self.tests_run = 0
         self.tests_passed = 0
-        self.session = requests.Session()
-        self.session.headers.update({'Content-Type': 'application/json'})
+        self.loop = asyncio.new_event_loop()
+        self.client = BookkeeperClient(base_url)
+
+    @property
+    def token(self):
+        return self.client.access_token
+
+    def run(self, coro):
+        """Run a client coroutine on the tester's event loop"""
+        return self.loop.run_until_complete(coro)
+
+    def close(self):
+        self.run(self.client.aclose())
+        self.loop.close()
 
     def log(self, message, level="INFO"):
         timestamp = datetime.now().strftime("%H:%M:%S")
@@ -21,26 +41,16 @@ class RestaurantAPITester:
 
     def run_test(self, name, method, endpoint, expected_status, data=None, headers=None):
         """Run a single API test"""
-        url = f"{self.base_url}/api/{endpoint}"
-        test_headers = self.session.headers.copy()
-        
-        if self.token:
-            test_headers['Authorization'] = f'Bearer {self.token}'
-        if headers:
-            test_headers.update(headers)
-
         self.tests_run += 1
         self.log(f"Testing {name}...")
         
         try:
-            if method == 'GET':
-                response = self.session.get(url, headers=test_headers)
-            elif method == 'POST':
-                response = self.session.post(url, json=data, headers=test_headers)
-            elif method == 'PUT':
-                response = self.session.put(url, json=data, headers=test_headers)
-            elif method == 'DELETE':
-                response = self.session.delete(url, headers=test_headers)
+            if endpoint == "../health":
+                response = self.run(self.client.health())
+            else:
+                response = self.run(self.client.request(
+                    method, endpoint, json=data if method in ('POST', 'PUT') else None, headers=headers
+                ))
 
             success = response.status_code == expected_status
             if success:
@@ -62,6 +72,23 @@ class RestaurantAPITester:
             self.log(f"❌ {name} - Error: {str(e)}", "FAIL")
             return False, {}
 
+    def spawn_proxy(self, **env):
+        """Start an extra proxy process on a free port with extra environment"""
+        # No readiness drain on shutdown unless a test asks for one
+        env = {"SHUTDOWN_DRAIN_SECONDS": "0", **env}
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            port = sock.getsockname()[1]
+
+        process = subprocess.Popen(
+            [sys.executable, "backend/server.py"],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            env=dict(os.environ, PROXY_PORT=str(port), **env),
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        return process, port
+
     def test_health_check(self):
         """Test health endpoint"""
         success, response = self.run_test(
@@ -72,6 +99,274 @@ class RestaurantAPITester:
         )
         return success
 
+    def test_proxy_startup_time(self, budget_seconds=5.0):
+        """Start a second proxy process and measure time until /ready answers 200"""
+        self.log("=== Testing Proxy Startup Time ===")
+        self.tests_run += 1
+
+        started = time.perf_counter()
+        process, port = self.spawn_proxy()
+
+        async def wait_ready():
+            async with BookkeeperClient(f"http://localhost:{port}") as client:
+                while time.perf_counter() - started < budget_seconds:
+                    try:
+                        if (await client.ready()).status_code == 200:
+                            return time.perf_counter() - started
+                    except httpx.TransportError:
+                        pass
+                    await asyncio.sleep(0.02)
+            return None
+
+        try:
+            elapsed = self.run(wait_ready())
+        finally:
+            process.terminate()
+            process.wait(timeout=30)
+
+        if elapsed is None:
+            self.log(f"❌ Proxy not ready within {budget_seconds:.1f}s", "FAIL")
+            return False
+
+        self.tests_passed += 1
+        self.log(f"✅ Proxy time-to-first-200 on /ready: {elapsed * 1000:.0f} ms", "PASS")
+        return True
+
+    def test_proxy_shutdown_drain(self, drain_seconds=2.0):
+        """After SIGTERM the proxy answers /ready with 503 but keeps serving, then exits"""
+        self.log("=== Testing Proxy Shutdown Drain ===")
+        self.tests_run += 1
+
+        process, port = self.spawn_proxy(SHUTDOWN_DRAIN_SECONDS=str(drain_seconds))
+
+        async def drain():
+            async with httpx.AsyncClient(base_url=f"http://localhost:{port}") as proxy:
+                deadline = time.perf_counter() + 10
+                while time.perf_counter() < deadline:
+                    try:
+                        if (await proxy.get("/ready")).status_code == 200:
+                            break
+                    except httpx.TransportError:
+                        pass
+                    await asyncio.sleep(0.05)
+
+                process.terminate()
+                await asyncio.sleep(0.3)
+                ready = await proxy.get("/ready")
+                api = await proxy.get("/api/health")
+                return ready.status_code, api.status_code
+
+        try:
+            ready_status, api_status = self.run(drain())
+            started = time.perf_counter()
+            process.wait(timeout=drain_seconds + 30)
+            exited_after = time.perf_counter() - started
+        finally:
+            if process.poll() is None:
+                process.kill()
+
+        if ready_status != 503 or api_status != 200:
+            self.log(f"❌ While draining: /ready {ready_status} (expected 503), "
+                     f"/api/health {api_status} (expected 200)", "FAIL")
+            return False
+
+        self.tests_passed += 1
+        self.log(f"✅ /ready 503 while draining, API still served, exited after {exited_after:.1f}s", "PASS")
+        return True
+
+    def test_admission_control(self):
+        """Token buckets, 429/503 with Retry-After, and sale entry under report load"""
+        self.log("=== Testing Admission Control ===")
+        self.tests_run += 1
+
+        # Small report limits so a handful of requests exhausts them
+        burst = 3
+        process, port = self.spawn_proxy(
+            ADMISSION_REPORTS_RATE="0.1",
+            ADMISSION_REPORTS_BURST=str(burst),
+            ADMISSION_REPORTS_CONCURRENCY="1",
+            ADMISSION_REPORTS_QUEUE="2",
+        )
+
+        def forged_token(user_id):
+            encode = lambda part: base64.urlsafe_b64encode(json.dumps(part).encode()).rstrip(b"=").decode()
+            return f"{encode({'alg': 'HS256', 'typ': 'JWT'})}.{encode({'userId': user_id})}.forged"
+
+        def shed(responses, status):
+            return [r for r in responses if r.status_code == status and "retry-after" in r.headers]
+
+        async def exercise():
+            async with httpx.AsyncClient(base_url=f"http://localhost:{port}", timeout=30.0) as proxy:
+                deadline = time.perf_counter() + 10
+                while time.perf_counter() < deadline:
+                    try:
+                        if (await proxy.get("/ready")).status_code == 200:
+                            break
+                    except httpx.TransportError:
+                        pass
+                    await asyncio.sleep(0.05)
+
+                def chef(token, device):
+                    return proxy.get("/api/reports/chef", headers={
+                        "Authorization": f"Bearer {token}", "X-Device-Id": device,
+                    })
+
+                # Unsigned tokens must not mint buckets: every made-up user
+                # shares the bucket of the peer address
+                forged = [await chef(forged_token(f"forged-{i}"), f"forged-{i}") for i in range(burst + 5)]
+
+                # One device flooding the reports class is shed with 429
+                flood = await asyncio.gather(*(chef(self.token, "admission-flood") for _ in range(burst + 7)))
+
+                # Fill the reports concurrency cap and queue from many devices
+                # while a sale is entered; sales have their own class
+                menu = await proxy.get("/api/menu/items", headers={"Authorization": f"Bearer {self.token}"})
+                items = menu.json() if menu.status_code == 200 else []
+                if not items:
+                    return forged, flood, [], None, None
+
+                async def sale():
+                    await asyncio.sleep(0.05)
+                    started = time.perf_counter()
+                    response = await proxy.post("/api/sales", json={"menuItemId": items[0]["id"], "amount": 1},
+                                                headers={"Authorization": f"Bearer {self.token}"})
+                    return response, time.perf_counter() - started
+
+                *load, (sale_response, sale_seconds) = await asyncio.gather(
+                    *(chef(self.token, f"admission-load-{i}") for i in range(8) for _ in range(burst)),
+                    sale(),
+                )
+                return forged, flood, load, sale_response, sale_seconds
+
+        try:
+            forged, flood, load, sale_response, sale_seconds = self.run(exercise())
+        finally:
+            process.terminate()
+            process.wait(timeout=30)
+
+        failures = []
+        if len(forged) - len(shed(forged, 429)) > burst:
+            failures.append(f"forged tokens got {len(forged) - len(shed(forged, 429))} requests past a bucket of {burst}")
+        if not shed(flood, 429) or len(flood) - len(shed(flood, 429)) > burst:
+            failures.append(f"flood: {len(shed(flood, 429))}/{len(flood)} shed with 429 and Retry-After")
+        if any(r.status_code in (429, 503) and "retry-after" not in r.headers for r in flood + load):
+            failures.append("429/503 without Retry-After")
+        if sale_response is None:
+            failures.append("no menu item to sell")
+        elif sale_response.status_code != 201 or sale_seconds > 2.0:
+            failures.append(f"sale under report load: {sale_response.status_code} in {sale_seconds:.2f}s")
+
+        if failures:
+            self.log(f"❌ Admission control: {'; '.join(failures)}", "FAIL")
+            return False
+
+        self.tests_passed += 1
+        self.log(f"✅ Forged tokens shared one bucket, flood shed {len(shed(flood, 429))}x 429, "
+                 f"{len(shed(load, 503))}x 503 under load, sale 201 in {sale_seconds * 1000:.0f} ms", "PASS")
+        return True
+
+    def test_native_route_parity(self, routes=("sales/today/totals", "sessions/active", "menu/items")):
+        """Start a proxy with NATIVE_ROUTES enabled and compare its bytes with Node's"""
+        self.log("=== Testing Native Fast Path Parity ===")
+        node_url = os.environ.get("NODE_BACKEND_URL", "http://localhost:8002")
+
+        process, port = self.spawn_proxy(NATIVE_ROUTES=",".join(routes))
+
+        async def compare():
+            results = []
+            async with httpx.AsyncClient(base_url=f"http://localhost:{port}") as proxy, \
+                    httpx.AsyncClient(base_url=node_url) as node:
+                deadline = time.perf_counter() + 10
+                while time.perf_counter() < deadline:
+                    try:
+                        if (await proxy.get("/ready")).status_code == 200:
+                            break
+                    except httpx.TransportError:
+                        pass
+                    await asyncio.sleep(0.05)
+
+                for route in routes:
+                    for label, headers in (
+                        ("authenticated", {"Authorization": f"Bearer {self.token}"}),
+                        ("no token", {}),
+                        ("bad token", {"Authorization": "Bearer invalid"}),
+                    ):
+                        # Totals can move between the two calls if a sale lands; retry once
+                        for _ in range(2):
+                            native = await proxy.get(f"/api/{route}", headers=headers)
+                            expected = await node.get(f"/api/{route}", headers=headers)
+                            same = (native.status_code, native.content) == (expected.status_code, expected.content)
+                            if same:
+                                break
+                        served = native.headers.get("x-served-by") == "native"
+                        results.append((f"{route} ({label})", same and served, native, expected))
+            return results
+
+        try:
+            results = self.run(compare())
+        finally:
+            process.terminate()
+            process.wait(timeout=30)
+
+        for name, passed, native, expected in results:
+            self.tests_run += 1
+            if passed:
+                self.tests_passed += 1
+                self.log(f"✅ {name} - byte-identical ({len(native.content)} bytes)", "PASS")
+            elif native.headers.get("x-served-by") != "native":
+                self.log(f"❌ {name} - not served natively (DATABASE_URL set?)", "FAIL")
+            else:
+                self.log(f"❌ {name} - native {native.status_code} {native.content[:200]!r}", "FAIL")
+                self.log(f"   node   {expected.status_code} {expected.content[:200]!r}", "ERROR")
+        return all(passed for _, passed, _, _ in results)
+
+    def test_capture_replay(self):
+        """Capture traffic through a proxy in capture mode, then replay it at max speed"""
+        from backend_replay import TrafficReplayer, load_capture
+
+        self.log("=== Testing Traffic Capture and Replay ===")
+        self.tests_run += 1
+
+        with tempfile.TemporaryDirectory() as directory:
+            capture_file = os.path.join(directory, "capture.jsonl")
+            process, port = self.spawn_proxy(CAPTURE_FILE=capture_file)
+
+            async def generate_traffic():
+                async with BookkeeperClient(f"http://localhost:{port}") as client:
+                    while True:
+                        try:
+                            if (await client.ready()).status_code == 200:
+                                break
+                        except httpx.TransportError:
+                            pass
+                        await asyncio.sleep(0.05)
+                    client.set_tokens(self.token)
+                    for _ in range(3):
+                        await asyncio.gather(client.menu.items(), client.menu.categories(), client.sessions.active())
+
+            try:
+                self.run(generate_traffic())
+            finally:
+                # Stopping the proxy flushes the capture file
+                process.terminate()
+                process.wait(timeout=30)
+
+            entries = load_capture([capture_file])
+
+        if len(entries) != 9 or any(self.token in json.dumps(entry) for entry in entries):
+            self.log(f"❌ Expected 9 redacted capture entries, got {len(entries)}", "FAIL")
+            return False
+
+        results = self.run(TrafficReplayer(self.base_url, speed=None).replay(entries))
+        mismatches = [result["mismatch"] for result in results if result["mismatch"]]
+        if mismatches:
+            self.log(f"❌ Replay differs from capture: {mismatches[:3]}", "FAIL")
+            return False
+
+        self.tests_passed += 1
+        self.log(f"✅ Captured and replayed {len(entries)} requests without differences", "PASS")
+        return True
+
     def test_login(self, username, password):
         """Test login and get token"""
         success, response = self.run_test(
@@ -82,7 +377,8 @@ class RestaurantAPITester:
             data={"username": username, "password": password}
         )
         if success and isinstance(response, dict) and 'accessToken' in response:
-            self.token = response['accessToken']
+            self.client.set_tokens(response['accessToken'], response.get('refreshToken'))
+            self.client.username, self.client.password = username, password
             self.log(f"✅ Login successful, token received")
             return True
         return False
@@ -334,6 +630,14 @@ class RestaurantAPITester:
         
         if success and isinstance(employees, list) and len(employees) > 0:
             employee_id = employees[0]['id']
+            today = datetime.now().strftime("%Y-%m-%d")
+            payroll_endpoint = f"employees/payroll?startDate={today}&endDate={today}"
+
+            def shifts_on_payroll(payroll):
+                rows = payroll.get('employees', []) if isinstance(payroll, dict) else []
+                return next((row['shifts'] for row in rows if row['id'] == employee_id), 0)
+
+            _, payroll_before = self.run_test("Get Payroll", "GET", payroll_endpoint, 200)
             
             # Check in employee
             success, _ = self.run_test(
@@ -350,6 +654,14 @@ class RestaurantAPITester:
                 f"employees/{employee_id}/checkout",
                 200
             )
+
+            # The checkout is added to today's payroll rollup
+            if success:
+                _, payroll_after = self.run_test("Get Payroll After Checkout", "GET", payroll_endpoint, 200)
+                if shifts_on_payroll(payroll_after) == shifts_on_payroll(payroll_before) + 1:
+                    self.log("✅ Checked-out shift counted in payroll")
+                else:
+                    self.log("❌ Checked-out shift missing from payroll")
         
         return success
 
@@ -480,8 +792,8 @@ class RestaurantAPITester:
         else:
             self.log("✅ Active session found")
         
-        session_start_time = active_session.get('startTime')
-        self.log(f"Session start time: {session_start_time}")
+        session_id = active_session.get('id')
+        self.log(f"Session start time: {active_session.get('startTime')}")
         
         time.sleep(1)
         
@@ -514,9 +826,9 @@ class RestaurantAPITester:
         
         # 3. Test Session Sales Calculation - Get initial session sales
         success, initial_session_sales = self.run_test(
-            "3. Get Initial Session Sales by Range",
+            "3. Get Initial Session Sales",
             "GET",
-            f"sales/range?startDate={session_start_time}&endDate={datetime.now().isoformat()}",
+            f"sales/session/{session_id}",
             200
         )
         
@@ -554,9 +866,9 @@ class RestaurantAPITester:
         
         # 5. Test Session Totals Update - Get updated session sales
         success, updated_session_sales = self.run_test(
-            "5. Get Updated Session Sales by Range",
+            "5. Get Updated Session Sales",
             "GET",
-            f"sales/range?startDate={session_start_time}&endDate={datetime.now().isoformat()}",
+            f"sales/session/{session_id}",
             200
         )
         
@@ -589,6 +901,21 @@ class RestaurantAPITester:
         
         self.log(f"Calculated session totals: Overall=€{session_totals['overall']:.2f}, Cash=€{session_totals['cash']:.2f}, Card=€{session_totals['card']:.2f}, Items={session_totals['itemCount']}")
         
+        # The aggregated session totals must match the per-sale calculation
+        success, server_totals = self.run_test(
+            "5b. Get Session Sales Totals",
+            "GET",
+            f"sales/session/{session_id}/totals",
+            200
+        )
+        
+        if success and isinstance(server_totals, dict):
+            if (abs(server_totals['overall'] - session_totals['overall']) < 0.005
+                    and server_totals['itemCount'] == session_totals['itemCount']):
+                self.log("✅ Aggregated session totals match individual sales")
+            else:
+                self.log(f"❌ Aggregated session totals differ: {server_totals}")
+        
         time.sleep(1)
         
         # 6. Test that daily totals are different from session totals (if there are older sales)
@@ -619,14 +946,14 @@ class RestaurantAPITester:
         )
         
         if success:
-            new_session_start = new_session_2.get('startTime')
+            new_session_id = new_session_2.get('id')
             time.sleep(1)
             
             # Get sales for this brand new session (should be empty)
             success, new_session_sales = self.run_test(
                 "8. Get New Session Sales (Should be Empty)",
                 "GET",
-                f"sales/range?startDate={new_session_start}&endDate={datetime.now().isoformat()}",
+                f"sales/session/{new_session_id}",
                 200
             )
             
@@ -648,6 +975,9 @@ class RestaurantAPITester:
             self.log("❌ Health check failed, stopping tests")
             return False
         
+        self.test_proxy_startup_time()
+        self.test_proxy_shutdown_drain()
+
         # Test authentication
         if not self.test_auth_endpoints():
             self.log("❌ Authentication failed, stopping tests")
@@ -662,7 +992,10 @@ class RestaurantAPITester:
             self.test_employee_management,
             self.test_inventory_management,
             self.test_expense_management,
-            self.test_reports
+            self.test_reports,
+            self.test_admission_control,
+            self.test_native_route_parity,
+            self.test_capture_replay
         ]
         
         for test_method in test_methods:
@@ -707,8 +1040,11 @@ class RestaurantAPITester:
 
 def main():
     tester = RestaurantAPITester()
-    # Run session-specific sales tests as requested
-    success = tester.run_session_sales_tests()
+    try:
+        # Run session-specific sales tests as requested
+        success = tester.run_session_sales_tests()
+    finally:
+        tester.close()
     return 0 if success else 1
 
 if __name__ == "__main__":
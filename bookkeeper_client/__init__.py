@@ -0,0 +1,15 @@
+"""Python client SDK for the Restaurant Bookkeeping API
+
+Usage::
+
+    async with BookkeeperClient(username="admin", password="password123") as api:
+        items = await api.menu.items()
+        await api.sales.create_many({"menu_item_id": item["id"]} for item in items)
+        async for sale in api.sales.iter_range("2024-01-01", "2024-01-31"):
+            ...
+"""
+
+from .batch import collect, gather
+from .client import ApiError, BookkeeperClient
+
+__all__ = ["ApiError", "BookkeeperClient", "collect", "gather"]
@@ -0,0 +1,274 @@
+"""Columnar sales extract for menu-engineering analysis
+
+Sales are pulled through the API once, flattened and stored as one Parquet
+file per (local) day. Later syncs only fetch days that are not on disk yet,
+and the analysis helpers work on the in-memory Arrow table with vectorised
+numpy/pyarrow kernels, so questions over months of history need no
+re-download.
+
+Requires the optional ``pyarrow`` and ``numpy`` packages::
+
+    pip install pyarrow numpy
+
+    store = SalesStore("sales-extract")
+    async with BookkeeperClient(username="admin", password="password123") as api:
+        await store.sync(api)
+    heatmap = revenue_by_hour_weekday(store.table())
+"""
+
+import argparse
+import asyncio
+from datetime import date, datetime, timedelta, tzinfo
+from pathlib import Path
+from typing import Dict, List, Optional
+
+try:
+    import numpy as np
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+except ImportError as exc:  # pragma: no cover - depends on the environment
+    raise ImportError(
+        "bookkeeper_client.analytics needs pyarrow and numpy: pip install pyarrow numpy"
+    ) from exc
+
+from .client import BookkeeperClient
+
+_string = pa.dictionary(pa.int32(), pa.string())
+
+SCHEMA = pa.schema([
+    ("sale_id", pa.string()),
+    ("timestamp", pa.timestamp("ms", tz="UTC")),
+    ("day", pa.date32()),
+    ("hour", pa.int8()),
+    ("weekday", pa.int8()),  # Monday = 0
+    ("user", _string),
+    ("menu_item_id", _string),
+    ("item", _string),
+    ("category", _string),
+    ("payment_type", _string),
+    ("amount", pa.int32()),
+    ("price", pa.float64()),
+    ("revenue", pa.float64()),
+])
+
+_FILE_PREFIX = "sales-"
+
+
+class SalesStore:
+    """Directory of day-partitioned Parquet files holding flattened sales"""
+
+    def __init__(self, path, tz: Optional[tzinfo] = None):
+        self.path = Path(path)
+        # Hour/weekday/day are derived in the restaurant's local time
+        self.tz = tz or datetime.now().astimezone().tzinfo
+        self._table: Optional[pa.Table] = None
+
+    def days(self) -> List[date]:
+        """Days already stored, oldest first"""
+        if not self.path.exists():
+            return []
+        return sorted(
+            date.fromisoformat(file.stem[len(_FILE_PREFIX):])
+            for file in self.path.glob(f"{_FILE_PREFIX}*.parquet")
+        )
+
+    async def sync(
+        self,
+        client: BookkeeperClient,
+        start: Optional[date] = None,
+        until: Optional[date] = None,
+    ) -> int:
+        """Fetch and store every day after the last stored one, up to ``until``
+
+        ``until`` defaults to yesterday so a still-running day is never frozen
+        into the extract. ``start`` is only used for the very first sync.
+        Returns the number of sales written.
+        """
+        until = until or date.today() - timedelta(days=1)
+        stored = self.days()
+        first = stored[-1] + timedelta(days=1) if stored else start
+        if first is None:
+            raise ValueError("start is required for the first sync of an empty store")
+        if first > until:
+            return 0
+
+        # Fetch one extra day on each side: API windows are server-local days,
+        # partitions are local days of ``tz``.
+        by_day: Dict[date, List[dict]] = {}
+        async for sale in client.sales.iter_range(first - timedelta(days=1), until + timedelta(days=1)):
+            row = self._flatten(sale)
+            if first <= row["day"] <= until:
+                by_day.setdefault(row["day"], []).append(row)
+
+        self.path.mkdir(parents=True, exist_ok=True)
+        written = 0
+        day = first
+        while day <= until:
+            rows = by_day.get(day, [])
+            # Empty days are stored too, so they are not fetched again
+            pq.write_table(
+                pa.Table.from_pylist(rows, schema=SCHEMA),
+                self.path / f"{_FILE_PREFIX}{day.isoformat()}.parquet",
+            )
+            written += len(rows)
+            day += timedelta(days=1)
+
+        self._table = None
+        return written
+
+    def table(self, start: Optional[date] = None, end: Optional[date] = None) -> pa.Table:
+        """All stored sales (optionally limited to ``start``..``end``) as one Arrow table"""
+        if self._table is None:
+            files = sorted(self.path.glob(f"{_FILE_PREFIX}*.parquet")) if self.path.exists() else []
+            tables = [pq.read_table(file, schema=SCHEMA) for file in files]
+            self._table = (
+                pa.concat_tables(tables).unify_dictionaries().combine_chunks()
+                if tables else SCHEMA.empty_table()
+            )
+        table = self._table
+        if start is not None:
+            table = table.filter(pc.greater_equal(table["day"], pa.scalar(start, pa.date32())))
+        if end is not None:
+            table = table.filter(pc.less_equal(table["day"], pa.scalar(end, pa.date32())))
+        return table
+
+    def _flatten(self, sale: dict) -> dict:
+        timestamp = datetime.fromisoformat(sale["timestamp"].replace("Z", "+00:00"))
+        local = timestamp.astimezone(self.tz)
+        menu_item = sale["menuItem"]
+        return {
+            "sale_id": sale["id"],
+            "timestamp": timestamp,
+            "day": local.date(),
+            "hour": local.hour,
+            "weekday": local.weekday(),
+            "user": sale.get("user", {}).get("username"),
+            "menu_item_id": sale["menuItemId"],
+            "item": menu_item["name"],
+            "category": menu_item.get("category", {}).get("name"),
+            "payment_type": sale["paymentType"],
+            "amount": sale["amount"],
+            "price": menu_item["price"],
+            "revenue": menu_item["price"] * sale["amount"],
+        }
+
+
+def revenue_by_hour_weekday(table: pa.Table) -> "np.ndarray":
+    """7 x 24 matrix of revenue, rows Monday..Sunday, columns hour of day"""
+    weekday = table["weekday"].to_numpy().astype(np.intp)
+    hour = table["hour"].to_numpy().astype(np.intp)
+    revenue = table["revenue"].to_numpy()
+    return np.bincount(weekday * 24 + hour, weights=revenue, minlength=7 * 24).reshape(7, 24)
+
+
+def item_mix(table: pa.Table) -> pa.Table:
+    """Units and revenue per menu item, best sellers first"""
+    result = table.group_by(["item", "category"]).aggregate([
+        ("amount", "sum"),
+        ("revenue", "sum"),
+    ])
+    return result.sort_by([("revenue_sum", "descending")])
+
+
+def payment_mix(table: pa.Table, freq: str = "day") -> pa.Table:
+    """Cash/card revenue and cash share per day, week (starting Monday) or month"""
+    days = table["day"].cast(pa.int32()).to_numpy()
+    if freq == "day":
+        buckets = days
+    elif freq == "week":
+        # 1970-01-01 was a Thursday
+        buckets = days - (days + 3) % 7
+    elif freq == "month":
+        months = days.astype("datetime64[D]").astype("datetime64[M]")
+        buckets = months.astype("datetime64[D]").astype(np.int32)
+    else:
+        raise ValueError("freq must be 'day', 'week' or 'month'")
+
+    periods, index = np.unique(buckets, return_inverse=True)
+    revenue = table["revenue"].to_numpy()
+    is_cash = pc.equal(table["payment_type"].cast(pa.string()), "CASH").to_numpy(zero_copy_only=False)
+    cash = np.bincount(index, weights=np.where(is_cash, revenue, 0.0), minlength=len(periods))
+    total = np.bincount(index, weights=revenue, minlength=len(periods))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        share = np.where(total > 0, cash / total, 0.0)
+
+    return pa.table({
+        "period": pa.array(periods.astype(np.int32), pa.int32()).cast(pa.date32()),
+        "cash": cash,
+        "card": total - cash,
+        "total": total,
+        "cash_share": share,
+    })
+
+
+def item_affinity(table: pa.Table, basket_minutes: int = 5, top: int = 20) -> pa.Table:
+    """Item pairs that are sold together most often, with their lift
+
+    Sales carry no ticket id, so a basket is approximated as everything one
+    user rang up within the same ``basket_minutes`` window.
+    """
+    if table.num_rows == 0:
+        return pa.table({"item_a": [], "item_b": [], "baskets": [], "lift": []})
+
+    items = table["item"].combine_chunks()
+    item_codes = items.indices.to_numpy()
+    item_names = items.dictionary.to_pylist()
+    users = table["user"].combine_chunks()
+    user_codes = pc.fill_null(users.indices, -1).to_numpy().astype(np.int64) + 1
+    window = table["timestamp"].cast(pa.int64()).to_numpy() // (basket_minutes * 60 * 1000)
+
+    # One int64 key per (user, window); a 1-D unique is much cheaper than axis=1
+    n_items = len(item_names)
+    _, basket = np.unique(window * (len(users.dictionary) + 1) + user_codes, return_inverse=True)
+    n_baskets = int(basket.max()) + 1
+
+    # Distinct (basket, item) codes, sorted by basket and then item; pairs are
+    # counted sparsely, since a basket holds a few of the menu's items at most
+    codes = np.sort(basket.reshape(-1).astype(np.int64) * n_items + item_codes)
+    codes = codes[np.concatenate(([True], codes[1:] != codes[:-1]))]
+    in_basket, item = codes // n_items, codes % n_items
+    basket_end = np.searchsorted(in_basket, in_basket, side="right")
+    partners = basket_end - np.arange(len(codes)) - 1
+    left = np.repeat(np.arange(len(codes)), partners)
+    right = left + 1 + np.arange(len(left)) - np.repeat(np.cumsum(partners) - partners, partners)
+
+    together = np.bincount(item[left] * n_items + item[right], minlength=n_items * n_items)
+    together = together.reshape(n_items, n_items)
+    per_item = np.bincount(item, minlength=n_items).astype(np.float64)
+
+    a, b = np.triu_indices(n_items, k=1)
+    counts = together[a, b]
+    order = np.argsort(-counts, kind="stable")[:top]
+    order = order[counts[order] > 0]
+    a, b, counts = a[order], b[order], counts[order]
+    lift = counts * n_baskets / (per_item[a] * per_item[b])
+
+    return pa.table({
+        "item_a": [item_names[i] for i in a],
+        "item_b": [item_names[i] for i in b],
+        "baskets": counts,
+        "lift": lift,
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sync the columnar sales extract")
+    parser.add_argument("path", help="directory holding the Parquet files")
+    parser.add_argument("--base-url", default="http://localhost:8001")
+    parser.add_argument("--username", default="admin")
+    parser.add_argument("--password", default="password123")
+    parser.add_argument("--start", type=date.fromisoformat, help="first day for an empty store")
+    args = parser.parse_args()
+
+    async def sync():
+        store = SalesStore(args.path)
+        async with BookkeeperClient(args.base_url, username=args.username, password=args.password) as api:
+            written = await store.sync(api, start=args.start)
+        print(f"✅ {written} sales added, {len(store.days())} days stored")
+
+    asyncio.run(sync())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,18 @@
+"""Helpers for running many API operations at once"""
+
+import asyncio
+from typing import Any, Awaitable, Iterable, List
+
+
+async def gather(awaitables: Iterable[Awaitable[Any]], return_exceptions: bool = False) -> List[Any]:
+    """Run awaitables concurrently and return their results in order
+
+    Concurrency is bounded by the client's semaphore, so it is safe to pass
+    hundreds of calls here; they queue instead of opening extra connections.
+    """
+    return await asyncio.gather(*awaitables, return_exceptions=return_exceptions)
+
+
+async def collect(iterator) -> List[Any]:
+    """Drain an async iterator (e.g. ``sales.iter_range``) into a list"""
+    return [row async for row in iterator]
@@ -0,0 +1,511 @@
+"""Async client for the Restaurant Bookkeeping API"""
+
+import asyncio
+import uuid
+from datetime import date, datetime, timedelta
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Union
+
+import httpx
+
+from .batch import gather
+from .types import (
+    ChefReport,
+    DailyClosing,
+    Employee,
+    Expense,
+    InventoryChange,
+    InventoryItem,
+    LoginResult,
+    MenuCategory,
+    MenuItem,
+    Payroll,
+    Sale,
+    SalesTotals,
+    Session,
+    SessionSalesTotals,
+    SessionSummary,
+    Shift,
+    User,
+)
+
+DateLike = Union[date, datetime, str]
+
+
+class ApiError(Exception):
+    """Raised when the API answers with a 4xx/5xx status"""
+
+    def __init__(self, status_code: int, message: str, response: httpx.Response):
+        super().__init__(f"{status_code}: {message}")
+        self.status_code = status_code
+        self.message = message
+        self.response = response
+
+    @classmethod
+    def from_response(cls, response: httpx.Response) -> "ApiError":
+        try:
+            body = response.json()
+            message = body.get("error") or body.get("detail") or response.text
+        except ValueError:
+            message = response.text
+        return cls(response.status_code, message, response)
+
+
+def _format_date(value: DateLike) -> str:
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
+
+def _to_date(value: DateLike) -> date:
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return datetime.fromisoformat(value.replace("Z", "+00:00")).date()
+
+
+class BookkeeperClient:
+    """Asyncio client with a keep-alive connection pool and bounded concurrency
+
+    One instance holds a single pooled ``httpx.AsyncClient``; every request
+    goes through a semaphore so batch helpers never open more than
+    ``concurrency`` requests at once. Expired access tokens are refreshed
+    transparently (falling back to a fresh login when credentials are known).
+    """
+
+    def __init__(
+        self,
+        base_url: str = "http://localhost:8001",
+        *,
+        username: Optional[str] = None,
+        password: Optional[str] = None,
+        concurrency: int = 8,
+        max_connections: int = 10,
+        timeout: float = 10.0,
+        device_id: Optional[str] = None,
+    ):
+        self.base_url = base_url
+        # Sent as X-Device-Id so the proxy gives this client its own admission buckets
+        self.device_id = device_id or f"py-{uuid.uuid4().hex[:16]}"
+        self.username = username
+        self.password = password
+        self.access_token: Optional[str] = None
+        self.refresh_token: Optional[str] = None
+        self._http = httpx.AsyncClient(
+            base_url=base_url,
+            headers={"Content-Type": "application/json", "X-Device-Id": self.device_id},
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+            ),
+            timeout=timeout,
+        )
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._refresh_lock = asyncio.Lock()
+
+        self.auth = AuthAPI(self)
+        self.users = UsersAPI(self)
+        self.menu = MenuAPI(self)
+        self.sales = SalesAPI(self)
+        self.sessions = SessionsAPI(self)
+        self.employees = EmployeesAPI(self)
+        self.inventory = InventoryAPI(self)
+        self.expenses = ExpensesAPI(self)
+        self.reports = ReportsAPI(self)
+
+    async def __aenter__(self) -> "BookkeeperClient":
+        if self.username and self.password and not self.access_token:
+            await self.auth.login(self.username, self.password)
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        await self._http.aclose()
+
+    async def health(self) -> httpx.Response:
+        """Proxy health check (not under /api)"""
+        async with self._semaphore:
+            return await self._http.get("/health")
+
+    async def ready(self) -> httpx.Response:
+        """Proxy readiness check: 200 once its upstream pool is warm, 503 before"""
+        async with self._semaphore:
+            return await self._http.get("/ready")
+
+    async def request(
+        self,
+        method: str,
+        path: str,
+        *,
+        json: Any = None,
+        params: Optional[Dict[str, Any]] = None,
+        headers: Optional[Dict[str, str]] = None,
+        auth: bool = True,
+    ) -> httpx.Response:
+        """Send a request to ``/api/<path>`` and return the raw response
+
+        A 401/403 on an authenticated call triggers one token refresh and retry,
+        unless the caller passed its own ``Authorization`` header, which is
+        then sent as is.
+        """
+        if headers and any(name.lower() == "authorization" for name in headers):
+            auth = False
+        used_token = self.access_token
+        response = await self._send(method, path, json, params, headers, auth)
+        if auth and response.status_code in (401, 403) and used_token:
+            if await self._renew_token(used_token):
+                response = await self._send(method, path, json, params, headers, auth)
+        return response
+
+    async def call(self, method: str, path: str, **kwargs: Any) -> Any:
+        """Like :meth:`request` but decode JSON and raise :class:`ApiError` on failure"""
+        response = await self.request(method, path, **kwargs)
+        if response.status_code >= 400:
+            raise ApiError.from_response(response)
+        return response.json()
+
+    async def _send(self, method, path, json, params, headers, auth) -> httpx.Response:
+        request_headers = dict(headers or {})
+        if auth and self.access_token:
+            request_headers["Authorization"] = f"Bearer {self.access_token}"
+        async with self._semaphore:
+            return await self._http.request(
+                method,
+                f"/api/{path.lstrip('/')}",
+                json=json,
+                params=params,
+                headers=request_headers,
+            )
+
+    async def _renew_token(self, stale_token: str) -> bool:
+        async with self._refresh_lock:
+            if self.access_token != stale_token:
+                # Another task already refreshed while we were waiting
+                return True
+            if self.refresh_token:
+                response = await self._send(
+                    "POST", "auth/refresh", {"refreshToken": self.refresh_token}, None, None, False
+                )
+                if response.status_code == 200:
+                    self.access_token = response.json()["accessToken"]
+                    return True
+            if self.username and self.password:
+                response = await self._send(
+                    "POST", "auth/login",
+                    {"username": self.username, "password": self.password}, None, None, False
+                )
+                if response.status_code == 200:
+                    result = response.json()
+                    self.set_tokens(result["accessToken"], result["refreshToken"])
+                    return True
+            return False
+
+    def set_tokens(self, access_token: str, refresh_token: Optional[str] = None) -> None:
+        """Use tokens obtained elsewhere (e.g. a login made through :meth:`request`)"""
+        self.access_token = access_token
+        if refresh_token is not None:
+            self.refresh_token = refresh_token
+
+
+class _Resource:
+    def __init__(self, client: BookkeeperClient):
+        self._client = client
+
+    async def _get(self, path: str, **params: Any) -> Any:
+        params = {k: _format_date(v) for k, v in params.items() if v is not None}
+        return await self._client.call("GET", path, params=params or None)
+
+    async def _post(self, path: str, data: Any = None) -> Any:
+        return await self._client.call("POST", path, json=data)
+
+    async def _put(self, path: str, data: Any = None) -> Any:
+        return await self._client.call("PUT", path, json=data)
+
+    async def _delete(self, path: str) -> Any:
+        return await self._client.call("DELETE", path)
+
+    async def _iter_range(
+        self, path: str, start: DateLike, end: DateLike, days: int
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Walk a ``/range`` endpoint in windows of ``days`` days, oldest first
+
+        Windows are fetched one ahead so the next page is already in flight
+        while the caller consumes the current one. Rows that appear in two
+        adjacent windows (timezone edges) are yielded once.
+        """
+        current, last = _to_date(start), _to_date(end)
+        windows = []
+        while current <= last:
+            window_end = min(current + timedelta(days=days - 1), last)
+            windows.append((current, window_end))
+            current = window_end + timedelta(days=1)
+
+        def fetch(window):
+            return asyncio.ensure_future(
+                self._get(path, startDate=window[0], endDate=window[1])
+            )
+
+        pending = fetch(windows[0]) if windows else None
+        previous_ids: set = set()
+        try:
+            for index in range(len(windows)):
+                rows = await pending
+                pending = fetch(windows[index + 1]) if index + 1 < len(windows) else None
+                page_ids = set()
+                for row in reversed(rows):
+                    page_ids.add(row["id"])
+                    if row["id"] not in previous_ids:
+                        yield row
+                previous_ids = page_ids
+        finally:
+            if pending is not None:
+                pending.cancel()
+
+
+class AuthAPI(_Resource):
+    async def login(self, username: str, password: str) -> LoginResult:
+        result = await self._client.call(
+            "POST", "auth/login", json={"username": username, "password": password}, auth=False
+        )
+        self._client.username, self._client.password = username, password
+        self._client.set_tokens(result["accessToken"], result["refreshToken"])
+        return result
+
+    async def refresh(self) -> str:
+        result = await self._client.call(
+            "POST", "auth/refresh", json={"refreshToken": self._client.refresh_token}, auth=False
+        )
+        self._client.access_token = result["accessToken"]
+        return result["accessToken"]
+
+    def logout(self) -> None:
+        self._client.access_token = None
+        self._client.refresh_token = None
+
+
+class UsersAPI(_Resource):
+    async def list(self) -> List[User]:
+        return await self._get("users")
+
+    async def create(self, username: str, password: str) -> User:
+        return await self._post("users", {"username": username, "password": password})
+
+    async def update_password(self, user_id: str, password: str) -> User:
+        return await self._put(f"users/{user_id}/password", {"password": password})
+
+    async def delete(self, user_id: str) -> dict:
+        return await self._delete(f"users/{user_id}")
+
+
+class MenuAPI(_Resource):
+    async def categories(self) -> List[MenuCategory]:
+        return await self._get("menu/categories")
+
+    async def create_category(self, name: str) -> MenuCategory:
+        return await self._post("menu/categories", {"name": name})
+
+    async def update_category(self, category_id: str, name: str) -> MenuCategory:
+        return await self._put(f"menu/categories/{category_id}", {"name": name})
+
+    async def delete_category(self, category_id: str) -> dict:
+        return await self._delete(f"menu/categories/{category_id}")
+
+    async def items(self) -> List[MenuItem]:
+        return await self._get("menu/items")
+
+    async def create_item(self, name: str, price: float, category_id: str) -> MenuItem:
+        return await self._post(
+            "menu/items", {"name": name, "price": price, "categoryId": category_id}
+        )
+
+    async def update_item(self, item_id: str, **fields: Any) -> MenuItem:
+        if "category_id" in fields:
+            fields["categoryId"] = fields.pop("category_id")
+        return await self._put(f"menu/items/{item_id}", fields)
+
+    async def delete_item(self, item_id: str) -> dict:
+        return await self._delete(f"menu/items/{item_id}")
+
+
+class SalesAPI(_Resource):
+    async def today(self) -> List[Sale]:
+        return await self._get("sales/today")
+
+    async def today_totals(self) -> SalesTotals:
+        return await self._get("sales/today/totals")
+
+    async def create(
+        self, menu_item_id: str, amount: int = 1, payment_type: Optional[str] = None
+    ) -> Sale:
+        data: Dict[str, Any] = {"menuItemId": menu_item_id, "amount": amount}
+        if payment_type is not None:
+            data["paymentType"] = payment_type
+        return await self._post("sales", data)
+
+    async def create_many(
+        self, sales: Iterable[Dict[str, Any]], *, return_exceptions: bool = False
+    ) -> List[Union[Sale, BaseException]]:
+        """Create several sales concurrently; each dict holds ``create`` keyword arguments"""
+        return await gather((self.create(**sale) for sale in sales), return_exceptions)
+
+    async def for_session(self, session_id: str) -> List[Sale]:
+        return await self._get(f"sales/session/{session_id}")
+
+    async def session_totals(self, session_id: str) -> SessionSalesTotals:
+        return await self._get(f"sales/session/{session_id}/totals")
+
+    async def range(self, start: DateLike, end: DateLike) -> List[Sale]:
+        return await self._get("sales/range", startDate=start, endDate=end)
+
+    def iter_range(self, start: DateLike, end: DateLike, days: int = 1) -> AsyncIterator[Sale]:
+        """Auto-paginate ``sales/range`` day by day, oldest sale first"""
+        return self._iter_range("sales/range", start, end, days)
+
+
+class SessionsAPI(_Resource):
+    async def active(self) -> Optional[Session]:
+        return await self._get("sessions/active")
+
+    async def today(self) -> List[Session]:
+        return await self._get("sessions/today")
+
+    async def start(self, name: Optional[str] = None) -> Session:
+        return await self._post("sessions/start", {"name": name} if name else {})
+
+    async def summary(self, session_id: str) -> SessionSummary:
+        return await self._get(f"sessions/{session_id}/summary")
+
+    async def end(self, session_id: str) -> Session:
+        return await self._put(f"sessions/{session_id}/end")
+
+    async def delete(self, session_id: str) -> dict:
+        return await self._delete(f"sessions/{session_id}")
+
+
+class EmployeesAPI(_Resource):
+    async def list(self) -> List[Employee]:
+        return await self._get("employees")
+
+    async def create(self, name: str, hourly_wage: float) -> Employee:
+        return await self._post("employees", {"name": name, "hourlyWage": hourly_wage})
+
+    async def update(
+        self, employee_id: str, name: Optional[str] = None, hourly_wage: Optional[float] = None
+    ) -> Employee:
+        data: Dict[str, Any] = {}
+        if name is not None:
+            data["name"] = name
+        if hourly_wage is not None:
+            data["hourlyWage"] = hourly_wage
+        return await self._put(f"employees/{employee_id}", data)
+
+    async def delete(self, employee_id: str) -> dict:
+        return await self._delete(f"employees/{employee_id}")
+
+    async def checkin(self, employee_id: str) -> Shift:
+        return await self._post(f"employees/{employee_id}/checkin")
+
+    async def checkout(self, employee_id: str) -> Shift:
+        return await self._post(f"employees/{employee_id}/checkout")
+
+    async def shifts_today(self) -> List[Shift]:
+        return await self._get("employees/shifts/today")
+
+    async def shifts_range(self, start: DateLike, end: DateLike) -> List[Shift]:
+        return await self._get("employees/shifts/range", startDate=start, endDate=end)
+
+    async def payroll(self, start: DateLike, end: DateLike) -> Payroll:
+        """Hours and wages per employee for whole days start..end, including running shifts"""
+        return await self._get("employees/payroll", startDate=start, endDate=end)
+
+
+class InventoryAPI(_Resource):
+    async def list(self) -> List[InventoryItem]:
+        return await self._get("inventory")
+
+    async def create(
+        self, name: str, unit: str, min_stock: float, purchase_price: float, stock: float = 0
+    ) -> InventoryItem:
+        return await self._post("inventory", {
+            "name": name,
+            "unit": unit,
+            "stock": stock,
+            "minStock": min_stock,
+            "purchasePrice": purchase_price,
+        })
+
+    async def update(self, item_id: str, **fields: Any) -> InventoryItem:
+        renames = {"min_stock": "minStock", "purchase_price": "purchasePrice"}
+        data = {renames.get(key, key): value for key, value in fields.items()}
+        return await self._put(f"inventory/{item_id}", data)
+
+    async def delete(self, item_id: str) -> dict:
+        return await self._delete(f"inventory/{item_id}")
+
+    async def delivery(self, item_id: str, amount: float, reason: Optional[str] = None) -> dict:
+        data: Dict[str, Any] = {"amount": amount}
+        if reason:
+            data["reason"] = reason
+        return await self._post(f"inventory/{item_id}/delivery", data)
+
+    async def consumption(self, item_id: str, amount: float, reason: Optional[str] = None) -> dict:
+        data: Dict[str, Any] = {"amount": amount}
+        if reason:
+            data["reason"] = reason
+        return await self._post(f"inventory/{item_id}/consumption", data)
+
+    async def changes(self, item_id: str) -> List[InventoryChange]:
+        return await self._get(f"inventory/{item_id}/changes")
+
+
+class ExpensesAPI(_Resource):
+    async def today(self) -> List[Expense]:
+        return await self._get("expenses/today")
+
+    async def today_total(self) -> float:
+        return (await self._get("expenses/today/total"))["total"]
+
+    async def create(self, amount: float, reason: str) -> Expense:
+        return await self._post("expenses", {"amount": amount, "reason": reason})
+
+    async def create_many(
+        self, expenses: Iterable[Dict[str, Any]], *, return_exceptions: bool = False
+    ) -> List[Union[Expense, BaseException]]:
+        return await gather((self.create(**expense) for expense in expenses), return_exceptions)
+
+    async def range(self, start: DateLike, end: DateLike) -> List[Expense]:
+        return await self._get("expenses/range", startDate=start, endDate=end)
+
+    def iter_range(self, start: DateLike, end: DateLike, days: int = 1) -> AsyncIterator[Expense]:
+        """Auto-paginate ``expenses/range`` day by day, oldest expense first"""
+        return self._iter_range("expenses/range", start, end, days)
+
+    async def delete(self, expense_id: str) -> dict:
+        return await self._delete(f"expenses/{expense_id}")
+
+    async def predefined(self) -> List[dict]:
+        return await self._get("expenses/predefined")
+
+
+class ReportsAPI(_Resource):
+    async def chef(self, period: str = "day", date: Optional[DateLike] = None) -> ChefReport:
+        return await self._get("reports/chef", period=period, date=date)
+
+    async def chef_many(
+        self, period: str, dates: Iterable[DateLike]
+    ) -> List[ChefReport]:
+        """Fetch chef reports for several dates concurrently"""
+        return await gather(self.chef(period, day) for day in dates)
+
+    async def daily_closing(self, date: Optional[DateLike] = None) -> DailyClosing:
+        return await self._get("reports/daily-closing", date=date)
+
+    async def save_daily_closing(
+        self, date: DateLike, actual_cash: float, start_cash: Optional[float] = None
+    ) -> dict:
+        data: Dict[str, Any] = {"date": _format_date(date), "actualCash": actual_cash}
+        if start_cash is not None:
+            data["startCash"] = start_cash
+        return await self._post("reports/daily-closing", data)
@@ -0,0 +1,164 @@
+"""Response shapes returned by the Restaurant Bookkeeping API"""
+
+from typing import Dict, List, Optional, TypedDict
+
+
+class UserRef(TypedDict):
+    username: str
+
+
+class User(TypedDict):
+    id: str
+    username: str
+    createdAt: str
+
+
+class LoginResult(TypedDict):
+    accessToken: str
+    refreshToken: str
+    user: dict
+
+
+class MenuCategory(TypedDict, total=False):
+    id: str
+    name: str
+    isDeleted: bool
+    menuItems: List["MenuItem"]
+
+
+class MenuItem(TypedDict, total=False):
+    id: str
+    name: str
+    price: float
+    soldCount: int
+    categoryId: str
+    isDeleted: bool
+    category: MenuCategory
+
+
+class Sale(TypedDict, total=False):
+    id: str
+    menuItemId: str
+    amount: int
+    paymentType: str
+    timestamp: str
+    userId: str
+    sessionId: Optional[str]
+    menuItem: MenuItem
+    user: UserRef
+
+
+class SalesTotals(TypedDict):
+    overall: float
+    cash: float
+    card: float
+    itemCount: int
+
+
+class SessionSalesTotals(SalesTotals):
+    soldCounts: Dict[str, int]
+
+
+class SessionSummary(TypedDict):
+    sales: dict
+    expenses: float
+    staffCosts: float
+
+
+class Session(TypedDict, total=False):
+    id: str
+    name: Optional[str]
+    date: str
+    startTime: str
+    endTime: Optional[str]
+    isActive: bool
+    userId: str
+    staffCost: float
+    user: UserRef
+
+
+class Shift(TypedDict, total=False):
+    id: str
+    employeeId: str
+    startTime: str
+    endTime: Optional[str]
+    duration: Optional[float]
+    wage: Optional[float]
+    sessionId: Optional[str]
+    employee: "Employee"
+
+
+class Employee(TypedDict, total=False):
+    id: str
+    name: str
+    hourlyWage: float
+    shifts: List[Shift]
+
+
+class PayrollEntry(TypedDict):
+    id: str
+    name: str
+    hourlyWage: float
+    shifts: int
+    hours: float
+    wages: float
+    openHours: float
+    openWages: float
+
+
+class Payroll(TypedDict):
+    dateRange: dict
+    employees: List[PayrollEntry]
+    totals: dict
+
+
+class InventoryItem(TypedDict, total=False):
+    id: str
+    name: str
+    unit: str
+    stock: float
+    minStock: float
+    purchasePrice: float
+    status: str
+
+
+class InventoryChange(TypedDict, total=False):
+    id: str
+    inventoryItemId: str
+    change: float
+    reason: str
+    timestamp: str
+    userId: str
+    user: UserRef
+
+
+class Expense(TypedDict, total=False):
+    id: str
+    amount: float
+    reason: str
+    timestamp: str
+    userId: str
+    sessionId: Optional[str]
+    user: UserRef
+
+
+class ChefReport(TypedDict):
+    period: str
+    dateRange: dict
+    revenue: dict
+    costs: dict
+    profit: float
+    topSellingItems: List[dict]
+    inventoryWarnings: List[dict]
+
+
+class DailyClosing(TypedDict):
+    date: str
+    previousBalance: float
+    sales: dict
+    expenses: float
+    staffCosts: float
+    expectedCash: float
+    actualCash: Optional[float]
+    difference: Optional[float]
+    isRecorded: bool
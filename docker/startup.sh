@@ -45,6 +45,7 @@ npx prisma generate
 # Run database migrations
 echo "🔄 Running database migrations..."
 npx prisma db push --accept-data-loss
+npx prisma db execute --file prisma/backfill.sql --schema prisma/schema.prisma || echo "⚠️ Backfill failed"
 
 # Seed default users and basic data if needed
 echo "👥 Checking and seeding default data..."
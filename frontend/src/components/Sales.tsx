@@ -45,31 +45,9 @@ const Sales: React.FC = () => {
       
       // Calculate session-specific data if there's an active session
       if (activeSession) {
-        const sessionStartTime = new Date(activeSession.startTime)
-        const sessionSalesRes = await apiService.getSalesByRange(
-          sessionStartTime.toISOString(),
-          new Date().toISOString()
-        )
-        
-        // Calculate session-specific totals
-        let sessionTotals = { overall: 0, cash: 0, card: 0, itemCount: 0 }
-        const soldCounts: {[itemId: string]: number} = {}
-        
-        sessionSalesRes.data.forEach((sale: any) => {
-          const saleAmount = sale.menuItem.price * sale.amount
-          sessionTotals.overall += saleAmount
-          sessionTotals.itemCount += sale.amount
-          
-          if (sale.paymentType === 'CASH') {
-            sessionTotals.cash += saleAmount
-          } else {
-            sessionTotals.card += saleAmount
-          }
-          
-          // Count sold items per menu item for this session
-          const itemId = sale.menuItemId
-          soldCounts[itemId] = (soldCounts[itemId] || 0) + sale.amount
-        })
+        // Totals and sold counts per menu item, aggregated server-side
+        const totalsRes = await apiService.getSessionSalesTotals(activeSession.id)
+        const { soldCounts, ...sessionTotals } = totalsRes.data
         
         setTodayTotals(sessionTotals)
         setSessionSoldCounts(soldCounts)
@@ -42,36 +42,10 @@ const SessionClosing: React.FC = () => {
         return
       }
 
-      const sessionStartTime = new Date(activeSession.startTime)
-      const now = new Date()
-      
-      // Get session-specific data
-      const [salesRes, expensesRes, shiftsRes] = await Promise.all([
-        apiService.getSalesByRange(sessionStartTime.toISOString(), now.toISOString()),
-        apiService.getExpensesByRange(sessionStartTime.toISOString(), now.toISOString()),
-        apiService.getTodayShifts()
-      ])
-      
-      // Calculate session sales
-      let sessionSales = { cash: 0, card: 0, total: 0 }
-      salesRes.data.forEach((sale: any) => {
-        const amount = sale.menuItem.price * sale.amount
-        sessionSales.total += amount
-        if (sale.paymentType === 'CASH') {
-          sessionSales.cash += amount
-        } else {
-          sessionSales.card += amount
-        }
-      })
-      
-      // Calculate session expenses
-      const sessionExpenses = expensesRes.data.reduce((sum: any, expense: any) => sum + expense.amount, 0)
-      
-      // Calculate session staff costs
-      const sessionShifts = shiftsRes.data.filter((shift: any) => 
-        new Date(shift.startTime) >= sessionStartTime
-      )
-      const sessionStaffCosts = sessionShifts.reduce((sum: any, shift: any) => sum + (shift.wage || 0), 0)
+      // Session-specific sales, expenses and staff costs
+      const summaryRes = await apiService.getSessionSummary(activeSession.id)
+      const { sales, expenses: sessionExpenses, staffCosts: sessionStaffCosts } = summaryRes.data
+      const sessionSales = { cash: sales.cash, card: sales.card, total: sales.total }
       
       // Get start cash from localStorage
       const savedStartingCash = localStorage.getItem('startingCash') || '100.00'
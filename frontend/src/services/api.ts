@@ -1,12 +1,27 @@
 import axios from 'axios'
 
 const API_BASE_URL = '/api'
+const DEVICE_ID_KEY = 'deviceId'
+
+// Stable per browser, so tablets sharing one login get their own rate-limit buckets
+const getDeviceId = () => {
+  let deviceId = localStorage.getItem(DEVICE_ID_KEY)
+  if (!deviceId) {
+    // randomUUID is only available in secure contexts (not on plain-http LAN tablets)
+    deviceId = typeof crypto !== 'undefined' && typeof crypto.randomUUID === 'function'
+      ? crypto.randomUUID()
+      : `${Date.now().toString(36)}-${Math.random().toString(36).slice(2)}`
+    localStorage.setItem(DEVICE_ID_KEY, deviceId)
+  }
+  return deviceId
+}
 
 class ApiService {
   private api = axios.create({
     baseURL: API_BASE_URL,
     headers: {
       'Content-Type': 'application/json',
+      'X-Device-Id': getDeviceId(),
     },
   })
 
@@ -32,8 +47,10 @@ class ApiService {
               return this.api(original)
             }
           } catch (refreshError) {
-            // Refresh failed, logout user
+            // Refresh failed, logout user (keep the device id)
+            const deviceId = localStorage.getItem(DEVICE_ID_KEY)
             localStorage.clear()
+            if (deviceId) localStorage.setItem(DEVICE_ID_KEY, deviceId)
             // Use window.location.reload() instead to trigger React Router properly
             window.location.reload()
           }
@@ -91,6 +108,10 @@ class ApiService {
     return this.api.post('/sessions/start', data)
   }
 
+  getSessionSummary(sessionId: string) {
+    return this.api.get(`/sessions/${sessionId}/summary`)
+  }
+
   endSession(sessionId: string) {
     return this.api.put(`/sessions/${sessionId}/end`)
   }
@@ -145,6 +166,10 @@ class ApiService {
     return this.api.post('/sales', saleData)
   }
 
+  getSessionSalesTotals(sessionId: string) {
+    return this.api.get(`/sales/session/${sessionId}/totals`)
+  }
+
   getSalesByRange(startDate: string, endDate: string) {
     return this.api.get(`/sales/range?startDate=${startDate}&endDate=${endDate}`)
   }
@@ -182,6 +207,10 @@ class ApiService {
     return this.api.get(`/employees/shifts/range?startDate=${startDate}&endDate=${endDate}`)
   }
 
+  getPayroll(startDate: string, endDate: string) {
+    return this.api.get(`/employees/payroll?startDate=${startDate}&endDate=${endDate}`)
+  }
+
   // Inventory endpoints
   getInventoryItems() {
     return this.api.get('/inventory')
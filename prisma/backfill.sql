@@ -0,0 +1,97 @@
+-- One-time backfills for columns and tables added after data was already
+-- recorded. Each block runs once and is then recorded in data_backfills, so
+-- the script is cheap to run after every `prisma db push` (see
+-- docker/startup.sh and `npm run db:backfill`). Rows left NULL afterwards
+-- (never in a session, or their session was deleted) stay NULL.
+
+-- Sales and expenses belong to the session whose time window contains them;
+-- if windows overlap, the most recently started session wins. Shifts belong
+-- to the session that was running when the employee checked in.
+DO $$
+BEGIN
+  IF EXISTS (SELECT 1 FROM "data_backfills" WHERE "name" = 'session_ids') THEN
+    RETURN;
+  END IF;
+
+  UPDATE "sales" AS s
+  SET "session_id" = m."session_id"
+  FROM (
+    SELECT DISTINCT ON (x."id") x."id", ss."id" AS "session_id"
+    FROM "sales" x
+    JOIN "sessions" ss
+      ON x."timestamp" >= ss."start_time"
+     AND (ss."end_time" IS NULL OR x."timestamp" <= ss."end_time")
+    WHERE x."session_id" IS NULL
+    ORDER BY x."id", ss."start_time" DESC
+  ) AS m
+  WHERE s."id" = m."id";
+
+  UPDATE "expenses" AS e
+  SET "session_id" = m."session_id"
+  FROM (
+    SELECT DISTINCT ON (x."id") x."id", ss."id" AS "session_id"
+    FROM "expenses" x
+    JOIN "sessions" ss
+      ON x."timestamp" >= ss."start_time"
+     AND (ss."end_time" IS NULL OR x."timestamp" <= ss."end_time")
+    WHERE x."session_id" IS NULL
+    ORDER BY x."id", ss."start_time" DESC
+  ) AS m
+  WHERE e."id" = m."id";
+
+  UPDATE "shifts" AS sh
+  SET "session_id" = m."session_id"
+  FROM (
+    SELECT DISTINCT ON (x."id") x."id", ss."id" AS "session_id"
+    FROM "shifts" x
+    JOIN "sessions" ss
+      ON x."start_time" >= ss."start_time"
+     AND (ss."end_time" IS NULL OR x."start_time" <= ss."end_time")
+    WHERE x."session_id" IS NULL
+    ORDER BY x."id", ss."start_time" DESC
+  ) AS m
+  WHERE sh."id" = m."id";
+
+  INSERT INTO "data_backfills" ("name") VALUES ('session_ids');
+END
+$$;
+
+-- Session staff costs and payroll rollups for shifts checked out before the
+-- rollups existed. Runs after the session backfill above so shifts already
+-- carry their session. Days are bucketed in the database's TimeZone, which
+-- has to match the Node server's (both UTC in the Docker setup).
+DO $$
+BEGIN
+  IF EXISTS (SELECT 1 FROM "data_backfills" WHERE "name" = 'payroll_rollups') THEN
+    RETURN;
+  END IF;
+
+  UPDATE "sessions" AS ss
+  SET "staff_cost" = x."wages"
+  FROM (
+    SELECT "session_id", SUM(COALESCE("wage", 0)) AS "wages"
+    FROM "shifts"
+    WHERE "end_time" IS NOT NULL AND "session_id" IS NOT NULL
+    GROUP BY "session_id"
+  ) AS x
+  WHERE ss."id" = x."session_id";
+
+  INSERT INTO "payroll_rollups" ("id", "date", "employee_id", "shifts", "hours", "wages")
+  SELECT md5(x."employee_id" || x."date"::text), x."date", x."employee_id", x."shifts", x."hours", x."wages"
+  FROM (
+    SELECT
+      "employee_id",
+      date_trunc('day', "start_time" AT TIME ZONE 'UTC' AT TIME ZONE current_setting('TimeZone'))
+        AT TIME ZONE current_setting('TimeZone') AT TIME ZONE 'UTC' AS "date",
+      COUNT(*) AS "shifts",
+      SUM(COALESCE("duration", 0)) AS "hours",
+      SUM(COALESCE("wage", 0)) AS "wages"
+    FROM "shifts"
+    WHERE "end_time" IS NOT NULL
+    GROUP BY 1, 2
+  ) AS x
+  ON CONFLICT ("date", "employee_id") DO NOTHING;
+
+  INSERT INTO "data_backfills" ("name") VALUES ('payroll_rollups');
+END
+$$;
@@ -1,6 +1,19 @@
 import express from 'express';
 import { PrismaClient } from '@prisma/client';
 import { authenticateToken, AuthRequest } from '../middleware/auth';
+import { invalidateAllReports, invalidateReportsAt } from '../services/reportCache';
+import { findActiveSessionId } from '../services/sessionData';
+import {
+  dayEnd,
+  dayStart,
+  liveShiftCosts,
+  loadActiveShifts,
+  payrollByEmployee,
+  recordCheckout,
+  trackShiftEnd,
+  trackShiftStart,
+  trackWageChange
+} from '../services/payroll';
 
 const router = express.Router();
 const prisma = new PrismaClient();
@@ -64,6 +77,8 @@ router.put('/:id', authenticateToken, async (req: AuthRequest, res) => {
       data: updateData
     });
 
+    trackWageChange(employee);
+
     res.json(employee);
   } catch (error) {
     console.error('Update employee error:', error);
@@ -76,10 +91,35 @@ router.delete('/:id', authenticateToken, async (req: AuthRequest, res) => {
   try {
     const { id } = req.params;
 
-    await prisma.employee.delete({
-      where: { id }
+    // The delete cascades to the employee's shifts and payroll rollups; take
+    // their checked-out wages back out of the sessions' staff cost with it
+    await prisma.$transaction(async tx => {
+      const wagesBySession = await tx.shift.groupBy({
+        by: ['sessionId'],
+        where: {
+          employeeId: id,
+          endTime: { not: null },
+          sessionId: { not: null }
+        },
+        _sum: { wage: true }
+      });
+
+      for (const group of wagesBySession) {
+        await tx.session.update({
+          where: { id: group.sessionId! },
+          data: { staffCost: { decrement: group._sum.wage || 0 } }
+        });
+      }
+
+      await tx.employee.delete({
+        where: { id }
+      });
     });
 
+    // Forget a running shift and any cached reports that counted them
+    trackShiftEnd(id);
+    await invalidateAllReports();
+
     res.json({ message: 'Employee deleted successfully' });
   } catch (error) {
     console.error('Delete employee error:', error);
@@ -91,6 +131,7 @@ router.delete('/:id', authenticateToken, async (req: AuthRequest, res) => {
 router.post('/:id/checkin', authenticateToken, async (req: AuthRequest, res) => {
   try {
     const { id } = req.params;
+    await loadActiveShifts();
 
     // Check if employee already has an active shift
     const activeShift = await prisma.shift.findFirst({
@@ -107,13 +148,17 @@ router.post('/:id/checkin', authenticateToken, async (req: AuthRequest, res) =>
     const shift = await prisma.shift.create({
       data: {
         employeeId: id,
-        startTime: new Date()
+        startTime: new Date(),
+        sessionId: await findActiveSessionId()
       },
       include: {
         employee: true
       }
     });
 
+    trackShiftStart(shift);
+    await invalidateReportsAt(shift.startTime);
+
     res.status(201).json(shift);
   } catch (error) {
     console.error('Check in employee error:', error);
@@ -125,6 +170,7 @@ router.post('/:id/checkin', authenticateToken, async (req: AuthRequest, res) =>
 router.post('/:id/checkout', authenticateToken, async (req: AuthRequest, res) => {
   try {
     const { id } = req.params;
+    await loadActiveShifts();
 
     const activeShift = await prisma.shift.findFirst({
       where: {
@@ -144,25 +190,109 @@ router.post('/:id/checkout', authenticateToken, async (req: AuthRequest, res) =>
     const duration = (endTime.getTime() - activeShift.startTime.getTime()) / (1000 * 60 * 60); // hours
     const wage = duration * activeShift.employee.hourlyWage;
 
-    const updatedShift = await prisma.shift.update({
-      where: { id: activeShift.id },
-      data: {
-        endTime,
-        duration,
-        wage
-      },
-      include: {
-        employee: true
+    // Close the shift and add it to the payroll rollups atomically; the
+    // endTime guard makes a concurrent second checkout a no-op
+    const updatedShift = await prisma.$transaction(async tx => {
+      const closed = await tx.shift.updateMany({
+        where: { id: activeShift.id, endTime: null },
+        data: {
+          endTime,
+          duration,
+          wage
+        }
+      });
+
+      if (closed.count === 0) {
+        return null;
       }
+
+      const shift = await tx.shift.findUniqueOrThrow({
+        where: { id: activeShift.id },
+        include: {
+          employee: true,
+          session: { select: { startTime: true } }
+        }
+      });
+      await recordCheckout(tx, shift);
+      return shift;
     });
 
-    res.json(updatedShift);
+    if (!updatedShift) {
+      return res.status(400).json({ error: 'Employee is not checked in' });
+    }
+
+    trackShiftEnd(id);
+    // The wage is added to its session's staff cost, which chef reports count
+    // under the period the session started in
+    const { session, ...closedShift } = updatedShift;
+    await invalidateReportsAt(closedShift.startTime, closedShift.endTime, session?.startTime);
+
+    res.json(closedShift);
   } catch (error) {
     console.error('Check out employee error:', error);
     res.status(500).json({ error: 'Internal server error' });
   }
 });
 
+// Payroll for whole days startDate..endDate: hours and wages per employee from
+// the rollups, plus the running cost of shifts that are still open
+router.get('/payroll', authenticateToken, async (req: AuthRequest, res) => {
+  try {
+    const { startDate, endDate } = req.query;
+
+    if (!startDate || !endDate) {
+      return res.status(400).json({ error: 'Start date and end date are required' });
+    }
+
+    const start = dayStart(new Date(startDate as string));
+    const end = dayEnd(new Date(endDate as string));
+
+    const [closed, open] = await Promise.all([
+      payrollByEmployee(start, end),
+      liveShiftCosts({ from: start, to: end })
+    ]);
+
+    const employees = await prisma.employee.findMany({
+      where: {
+        id: { in: Array.from(new Set([...closed.keys(), ...open.keys()])) }
+      },
+      orderBy: { name: 'asc' }
+    });
+
+    const rows = employees.map(employee => {
+      const rollup = closed.get(employee.id) || { shifts: 0, hours: 0, wages: 0 };
+      const live = open.get(employee.id) || { hours: 0, wage: 0 };
+      return {
+        id: employee.id,
+        name: employee.name,
+        hourlyWage: employee.hourlyWage,
+        shifts: rollup.shifts,
+        hours: rollup.hours,
+        wages: rollup.wages,
+        openHours: live.hours,
+        openWages: live.wage
+      };
+    });
+
+    const totals = rows.reduce((sum, row) => ({
+      shifts: sum.shifts + row.shifts,
+      hours: sum.hours + row.hours,
+      wages: sum.wages + row.wages,
+      openHours: sum.openHours + row.openHours,
+      openWages: sum.openWages + row.openWages
+    }), { shifts: 0, hours: 0, wages: 0, openHours: 0, openWages: 0 });
+
+    res.json({
+      dateRange: { start, end },
+      employees: rows,
+      totals
+    });
+  } catch (error) {
+    console.error('Get payroll error:', error);
+    res.status(500).json({ error: 'Internal server error' });
+  }
+});
+
 // Get shifts for today
 router.get('/shifts/today', authenticateToken, async (req: AuthRequest, res) => {
   try {
@@ -1,6 +1,8 @@
 import express from 'express';
 import { PrismaClient } from '@prisma/client';
 import { authenticateToken, AuthRequest } from '../middleware/auth';
+import { invalidateReportsAt } from '../services/reportCache';
+import { findActiveSessionId } from '../services/sessionData';
 
 const router = express.Router();
 const prisma = new PrismaClient();
@@ -76,7 +78,8 @@ router.post('/', authenticateToken, async (req: AuthRequest, res) => {
       data: {
         amount: parseFloat(amount),
         reason,
-        userId
+        userId,
+        sessionId: await findActiveSessionId()
       },
       include: {
         user: {
@@ -85,6 +88,8 @@ router.post('/', authenticateToken, async (req: AuthRequest, res) => {
       }
     });
 
+    await invalidateReportsAt(expense.timestamp);
+
     res.status(201).json(expense);
   } catch (error) {
     console.error('Create expense error:', error);
@@ -132,10 +137,16 @@ router.delete('/:id', authenticateToken, async (req: AuthRequest, res) => {
   try {
     const { id } = req.params;
 
-    await prisma.expense.delete({
-      where: { id }
+    const expense = await prisma.expense.delete({
+      where: { id },
+      include: {
+        session: { select: { startTime: true } }
+      }
     });
 
+    // Chef reports count the expense under the period its session started in
+    await invalidateReportsAt(expense.timestamp, expense.session?.startTime);
+
     res.json({ message: 'Expense deleted successfully' });
   } catch (error) {
     console.error('Delete expense error:', error);
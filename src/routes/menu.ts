@@ -1,6 +1,7 @@
 import express from 'express';
 import { PrismaClient } from '@prisma/client';
 import { authenticateToken, AuthRequest } from '../middleware/auth';
+import { invalidateAllReports } from '../services/reportCache';
 
 const router = express.Router();
 const prisma = new PrismaClient();
@@ -62,6 +63,9 @@ router.put('/categories/:id', authenticateToken, async (req: AuthRequest, res) =
       data: { name }
     });
 
+    // Category names appear in stored top-seller lists
+    await invalidateAllReports();
+
     res.json(category);
   } catch (error) {
     console.error('Update category error:', error);
@@ -88,6 +92,8 @@ router.delete('/categories/:id', authenticateToken, async (req: AuthRequest, res
       })
     ]);
 
+    await invalidateAllReports();
+
     res.json({ message: 'Category deleted successfully' });
   } catch (error) {
     console.error('Delete category error:', error);
@@ -161,6 +167,9 @@ router.put('/items/:id', authenticateToken, async (req: AuthRequest, res) => {
       }
     });
 
+    // Revenue is computed from the current price, so a price change rewrites history
+    await invalidateAllReports();
+
     res.json(item);
   } catch (error) {
     console.error('Update menu item error:', error);
@@ -176,6 +185,8 @@ router.delete('/items/:id', authenticateToken, async (req: AuthRequest, res) =>
       where: { id }
     });
 
+    await invalidateAllReports();
+
     res.json({ message: 'Menu item deleted successfully' });
   } catch (error) {
     console.error('Delete menu item error:', error);
@@ -1,10 +1,96 @@
 import express from 'express';
 import { PrismaClient } from '@prisma/client';
 import { authenticateToken, AuthRequest } from '../middleware/auth';
+import { staffCostForDay } from '../services/payroll';
+import { cacheGeneration, getCachedReport, isPeriodClosed, storeReport } from '../services/reportCache';
+import { summarizeSales } from '../services/sessionData';
 
 const router = express.Router();
 const prisma = new PrismaClient();
 
+interface ChefReportBody {
+  dateRange: { start: string; end: string };
+  revenue: { total: number; cash: number; card: number };
+  costs: { expenses: number; staff: number; total: number };
+  profit: number;
+  topSellingItems: { name: string; category: string; count: number; revenue: number }[];
+}
+
+// Revenue, costs and top sellers from completed sessions in the range
+const computeChefReport = async (startDate: Date, endDate: Date): Promise<ChefReportBody> => {
+  const dateRange = { start: startDate.toISOString(), end: endDate.toISOString() };
+
+  // First, get completed sessions in the date range
+  const completedSessions = await prisma.session.findMany({
+    where: {
+      isActive: false,
+      startTime: { gte: startDate, lte: endDate }
+    },
+    select: { id: true, staffCost: true }
+  });
+
+  if (completedSessions.length === 0) {
+    // No completed sessions in the period - return empty report
+    return {
+      dateRange,
+      revenue: { total: 0, cash: 0, card: 0 },
+      costs: { expenses: 0, staff: 0, total: 0 },
+      profit: 0,
+      topSellingItems: []
+    };
+  }
+
+  // Sales and expenses are stamped with their session, so everything below
+  // is an indexed aggregate over the completed sessions' ids
+  const sessionIds = completedSessions.map(session => session.id);
+
+  const [salesSummary, expenses] = await Promise.all([
+    summarizeSales({ sessionId: { in: sessionIds } }),
+    prisma.expense.aggregate({
+      where: { sessionId: { in: sessionIds } },
+      _sum: { amount: true }
+    })
+  ]);
+
+  const totalRevenue = salesSummary.totals.overall;
+  const cashRevenue = salesSummary.totals.cash;
+  const cardRevenue = salesSummary.totals.card;
+  const totalExpenses = expenses._sum.amount || 0;
+  // Staff cost is kept per session at shift checkout
+  const totalStaffCosts = completedSessions.reduce((sum, session) => sum + session.staffCost, 0);
+
+  // Calculate profit
+  const totalCosts = totalExpenses + totalStaffCosts;
+  const profit = totalRevenue - totalCosts;
+
+  // Top selling items
+  const topItems = salesSummary.items
+    .map(item => ({
+      name: item.menuItem.name,
+      category: item.menuItem.category.name,
+      count: item.count,
+      revenue: item.revenue
+    }))
+    .sort((a, b) => b.revenue - a.revenue)
+    .slice(0, 10);
+
+  return {
+    dateRange,
+    revenue: {
+      total: totalRevenue,
+      cash: cashRevenue,
+      card: cardRevenue
+    },
+    costs: {
+      expenses: totalExpenses,
+      staff: totalStaffCosts,
+      total: totalCosts
+    },
+    profit,
+    topSellingItems: topItems
+  };
+};
+
 // Chef Report - Based on completed sessions only
 router.get('/chef', authenticateToken, async (req: AuthRequest, res) => {
   try {
@@ -36,122 +122,19 @@ router.get('/chef', authenticateToken, async (req: AuthRequest, res) => {
         endDate.setHours(23, 59, 59, 999);
     }
 
-    // First, get completed sessions in the date range
-    const completedSessions = await prisma.session.findMany({
-      where: {
-        isActive: false,
-        startTime: { gte: startDate, lte: endDate }
-      }
-    });
-
-    if (completedSessions.length === 0) {
-      // No completed sessions in the period - return empty report
-      return res.json({
-        period,
-        dateRange: { start: startDate.toISOString(), end: endDate.toISOString() },
-        revenue: { total: 0, cash: 0, card: 0 },
-        costs: { expenses: 0, staff: 0, total: 0 },
-        profit: 0,
-        topSellingItems: [],
-        inventoryWarnings: []
-      });
-    }
-
-    // Get sales data from the date range (will be filtered later)
-    const sales = await prisma.sale.findMany({
-      where: {
-        timestamp: { gte: startDate, lte: endDate }
-      },
-      include: {
-        menuItem: {
-          include: { category: true }
-        }
-      }
-    });
-
-    // Filter sales to only include those from completed sessions
-    const sessionRanges = completedSessions.map(session => ({
-      start: new Date(session.startTime),
-      end: session.endTime ? new Date(session.endTime) : new Date()
-    }));
-
-    const sessionSales = sales.filter(sale => {
-      return sessionRanges.some(range => 
-        sale.timestamp >= range.start && sale.timestamp <= range.end
-      );
-    });
-
-    // Calculate revenue from completed sessions only
-    let totalRevenue = 0;
-    let cashRevenue = 0;
-    let cardRevenue = 0;
-    const itemSales: { [key: string]: { name: string; category: string; count: number; revenue: number } } = {};
-
-    sessionSales.forEach(sale => {
-      const saleAmount = sale.menuItem.price * sale.amount;
-      totalRevenue += saleAmount;
-      
-      if (sale.paymentType === 'CASH') {
-        cashRevenue += saleAmount;
-      } else {
-        cardRevenue += saleAmount;
-      }
-
-      // Track item sales
-      const itemKey = sale.menuItem.id;
-      if (!itemSales[itemKey]) {
-        itemSales[itemKey] = {
-          name: sale.menuItem.name,
-          category: sale.menuItem.category.name,
-          count: 0,
-          revenue: 0
-        };
-      }
-      itemSales[itemKey].count += sale.amount;
-      itemSales[itemKey].revenue += saleAmount;
-    });
-
-    // Get expenses only from completed sessions
-    const allExpenses = await prisma.expense.findMany({
-      where: {
-        timestamp: { gte: startDate, lte: endDate }
-      }
-    });
-
-    // Filter expenses to only include those from completed sessions
-    const sessionExpenses = allExpenses.filter(expense => {
-      return sessionRanges.some(range => 
-        expense.timestamp >= range.start && expense.timestamp <= range.end
-      );
-    });
-    const totalExpenses = sessionExpenses.reduce((sum, expense) => sum + expense.amount, 0);
+    const periodKey = period === 'week' || period === 'month' ? period : 'day';
+    const generation = cacheGeneration();
+    const closed = await isPeriodClosed(startDate, endDate);
 
-    // Get staff costs only from completed sessions
-    const allShifts = await prisma.shift.findMany({
-      where: {
-        startTime: { gte: startDate, lte: endDate }
+    let report = closed ? await getCachedReport<ChefReportBody>(periodKey, startDate) : null;
+    if (!report) {
+      report = await computeChefReport(startDate, endDate);
+      if (closed) {
+        await storeReport(periodKey, startDate, endDate, report, generation);
       }
-    });
-
-    // Filter shifts to only include those from completed sessions
-    const sessionShifts = allShifts.filter(shift => {
-      return sessionRanges.some(range => 
-        shift.startTime >= range.start && 
-        (shift.endTime ? shift.endTime <= range.end : true)
-      );
-    });
-    const totalStaffCosts = sessionShifts.reduce((sum, shift) => sum + (shift.wage || 0), 0);
-
-    // Calculate profit
-    const totalCosts = totalExpenses + totalStaffCosts;
-    const profit = totalRevenue - totalCosts;
-
-    // Top selling items
-    const topItems = Object.values(itemSales)
-      .sort((a, b) => b.revenue - a.revenue)
-      .slice(0, 10);
+    }
 
-    // Inventory warnings
+    // Inventory warnings reflect current stock, so they are never cached
     const lowStockItems = await prisma.inventoryItem.findMany({
       where: {
         stock: { lte: prisma.inventoryItem.fields.minStock }
@@ -160,19 +143,7 @@ router.get('/chef', authenticateToken, async (req: AuthRequest, res) => {
 
     res.json({
       period,
-      dateRange: { start: startDate, end: endDate },
-      revenue: {
-        total: totalRevenue,
-        cash: cashRevenue,
-        card: cardRevenue
-      },
-      costs: {
-        expenses: totalExpenses,
-        staff: totalStaffCosts,
-        total: totalCosts
-      },
-      profit,
-      topSellingItems: topItems,
+      ...report,
       inventoryWarnings: lowStockItems.map(item => ({
         name: item.name,
         currentStock: item.stock,
@@ -208,23 +179,11 @@ router.get('/daily-closing', authenticateToken, async (req: AuthRequest, res) =>
     });
 
     // Calculate today's data
-    const sales = await prisma.sale.findMany({
-      where: {
-        timestamp: { gte: startOfDay, lte: endOfDay }
-      },
-      include: { menuItem: true }
-    });
-
-    let salesCash = 0;
-    let salesCard = 0;
-    sales.forEach(sale => {
-      const amount = sale.menuItem.price * sale.amount;
-      if (sale.paymentType === 'CASH') {
-        salesCash += amount;
-      } else {
-        salesCard += amount;
-      }
+    const { totals } = await summarizeSales({
+      timestamp: { gte: startOfDay, lte: endOfDay }
     });
+    const salesCash = totals.cash;
+    const salesCard = totals.card;
 
     const expenses = await prisma.expense.aggregate({
       where: {
@@ -234,12 +193,8 @@ router.get('/daily-closing', authenticateToken, async (req: AuthRequest, res) =>
     });
     const totalExpenses = expenses._sum.amount || 0;
 
-    const shifts = await prisma.shift.findMany({
-      where: {
-        startTime: { gte: startOfDay, lte: endOfDay }
-      }
-    });
-    const staffCosts = shifts.reduce((sum, shift) => sum + (shift.wage || 0), 0);
+    // Checked-out shifts from the payroll rollups, running shifts at their cost so far
+    const staffCosts = await staffCostForDay(startOfDay);
 
     // Get previous day's balance
     const previousDay = new Date(targetDate);
@@ -293,23 +248,11 @@ router.post('/daily-closing', authenticateToken, async (req: AuthRequest, res) =
     endOfDay.setHours(23, 59, 59, 999);
 
     // Calculate the day's totals
-    const sales = await prisma.sale.findMany({
-      where: {
-        timestamp: { gte: startOfDay, lte: endOfDay }
-      },
-      include: { menuItem: true }
-    });
-
-    let salesCash = 0;
-    let salesCard = 0;
-    sales.forEach(sale => {
-      const amount = sale.menuItem.price * sale.amount;
-      if (sale.paymentType === 'CASH') {
-        salesCash += amount;
-      } else {
-        salesCard += amount;
-      }
+    const { totals } = await summarizeSales({
+      timestamp: { gte: startOfDay, lte: endOfDay }
     });
+    const salesCash = totals.cash;
+    const salesCard = totals.card;
 
     const expenses = await prisma.expense.aggregate({
       where: {
@@ -1,6 +1,8 @@
 import express from 'express';
 import { PrismaClient } from '@prisma/client';
 import { authenticateToken, AuthRequest } from '../middleware/auth';
+import { invalidateReportsAt } from '../services/reportCache';
+import { findActiveSessionId, summarizeSales } from '../services/sessionData';
 
 const router = express.Router();
 const prisma = new PrismaClient();
@@ -98,13 +100,14 @@ router.post('/', authenticateToken, async (req: AuthRequest, res) => {
 
     // Start transaction to update sold count and create sale
     const result = await prisma.$transaction(async (tx) => {
-      // Create the sale
+      // Create the sale, stamped with the active session
       const sale = await tx.sale.create({
         data: {
           menuItemId,
           amount,
           paymentType,
-          userId
+          userId,
+          sessionId: await findActiveSessionId(tx)
         },
         include: {
           menuItem: {
@@ -131,6 +134,8 @@ router.post('/', authenticateToken, async (req: AuthRequest, res) => {
       return sale;
     });
 
+    await invalidateReportsAt(result.timestamp);
+
     res.status(201).json(result);
   } catch (error) {
     console.error('Create sale error:', error);
@@ -138,6 +143,51 @@ router.post('/', authenticateToken, async (req: AuthRequest, res) => {
   }
 });
 
+// Get sales of one session
+router.get('/session/:id', authenticateToken, async (req: AuthRequest, res) => {
+  try {
+    const { id } = req.params;
+
+    const sales = await prisma.sale.findMany({
+      where: { sessionId: id },
+      include: {
+        menuItem: {
+          include: {
+            category: true
+          }
+        },
+        user: {
+          select: { username: true }
+        }
+      },
+      orderBy: { timestamp: 'desc' }
+    });
+
+    res.json(sales);
+  } catch (error) {
+    console.error('Get session sales error:', error);
+    res.status(500).json({ error: 'Internal server error' });
+  }
+});
+
+// Get sales totals and sold counts per menu item for one session
+router.get('/session/:id/totals', authenticateToken, async (req: AuthRequest, res) => {
+  try {
+    const { id } = req.params;
+
+    const { totals, items } = await summarizeSales({ sessionId: id });
+    const soldCounts: { [menuItemId: string]: number } = {};
+    items.forEach(item => {
+      soldCounts[item.menuItem.id] = item.count;
+    });
+
+    res.json({ ...totals, soldCounts });
+  } catch (error) {
+    console.error('Get session sales totals error:', error);
+    res.status(500).json({ error: 'Internal server error' });
+  }
+});
+
 // Get sales by date range
 router.get('/range', authenticateToken, async (req: AuthRequest, res) => {
   try {
@@ -1,6 +1,9 @@
 import express from 'express';
 import { PrismaClient } from '@prisma/client';
 import { authenticateToken, AuthRequest } from '../middleware/auth';
+import { liveShiftCosts, totalWage } from '../services/payroll';
+import { invalidateReportsAt } from '../services/reportCache';
+import { summarizeSales } from '../services/sessionData';
 
 const router = express.Router();
 const prisma = new PrismaClient();
@@ -95,6 +98,38 @@ router.post('/start', authenticateToken, async (req: AuthRequest, res) => {
   }
 });
 
+// Session summary for closing - grouped aggregates over the session's own rows
+router.get('/:id/summary', authenticateToken, async (req: AuthRequest, res) => {
+  try {
+    const { id } = req.params;
+
+    const [salesSummary, expenses, session, openShifts] = await Promise.all([
+      summarizeSales({ sessionId: id }),
+      prisma.expense.aggregate({
+        where: { sessionId: id },
+        _sum: { amount: true }
+      }),
+      prisma.session.findUnique({
+        where: { id },
+        select: { staffCost: true }
+      }),
+      liveShiftCosts({ sessionId: id })
+    ]);
+
+    const { overall, cash, card, itemCount } = salesSummary.totals;
+
+    res.json({
+      sales: { cash, card, total: overall, itemCount },
+      expenses: expenses._sum.amount || 0,
+      // Checked-out shifts plus the cost so far of shifts still running
+      staffCosts: (session?.staffCost || 0) + totalWage(openShifts)
+    });
+  } catch (error) {
+    console.error('Get session summary error:', error);
+    res.status(500).json({ error: 'Internal server error' });
+  }
+});
+
 // End session
 router.put('/:id/end', authenticateToken, async (req: AuthRequest, res) => {
   try {
@@ -125,10 +160,12 @@ router.delete('/:id', authenticateToken, async (req: AuthRequest, res) => {
   try {
     const { id } = req.params;
 
-    await prisma.session.delete({
+    const session = await prisma.session.delete({
       where: { id }
     });
 
+    await invalidateReportsAt(session.startTime, session.endTime);
+
     res.json({ message: 'Session deleted successfully' });
   } catch (error) {
     console.error('Delete session error:', error);
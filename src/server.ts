@@ -18,6 +18,8 @@ import sessionRoutes from './routes/sessions';
 dotenv.config();
 
 const app = express();
+// Requests arrive through the FastAPI proxy on localhost; key rate limits on the forwarded client address
+app.set('trust proxy', 'loopback');
 const PORT = process.env.PORT || (process.env.NODE_ENV === 'production' ? 8001 : 3000);
 
 // Rate limiting - relaxed for development
@@ -0,0 +1,153 @@
+import { Employee, Prisma, PrismaClient, Shift } from '@prisma/client';
+
+const prisma = new PrismaClient();
+
+// Staff cost is maintained incrementally: every checkout adds the finished
+// shift to its per-employee, per-day payroll rollup and to its session's
+// staffCost in the same transaction, so reports and payroll never scan the
+// shift history. Shifts that are still running are costed live from the
+// in-memory set below, which holds at most one shift per employee.
+
+interface ActiveShift {
+  id: string;
+  employeeId: string;
+  startTime: Date;
+  sessionId: string | null;
+  hourlyWage: number;
+}
+
+export interface ShiftCost {
+  hours: number;
+  wage: number;
+}
+
+const activeShifts = new Map<string, ActiveShift>();
+let loading: Promise<void> | null = null;
+
+// Filled from the database once, then kept current by checkin/checkout
+export const loadActiveShifts = () => {
+  if (!loading) {
+    loading = prisma.shift
+      .findMany({ where: { endTime: null }, include: { employee: true } })
+      .then(shifts => shifts.forEach(trackShiftStart))
+      .catch(error => {
+        loading = null;
+        throw error;
+      });
+  }
+  return loading;
+};
+
+// Rollups bucket shifts by the local day they started, like daily closing
+export const dayStart = (date: Date) => {
+  const start = new Date(date);
+  start.setHours(0, 0, 0, 0);
+  return start;
+};
+
+export const dayEnd = (date: Date) => {
+  const end = new Date(date);
+  end.setHours(23, 59, 59, 999);
+  return end;
+};
+
+export const trackShiftStart = (shift: Shift & { employee: Employee }) => {
+  activeShifts.set(shift.employeeId, {
+    id: shift.id,
+    employeeId: shift.employeeId,
+    startTime: shift.startTime,
+    sessionId: shift.sessionId,
+    hourlyWage: shift.employee.hourlyWage
+  });
+};
+
+export const trackShiftEnd = (employeeId: string) => {
+  activeShifts.delete(employeeId);
+};
+
+// Checkout bills the wage current at checkout time, so live costs follow it too
+export const trackWageChange = (employee: Employee) => {
+  const shift = activeShifts.get(employee.id);
+  if (shift) {
+    shift.hourlyWage = employee.hourlyWage;
+  }
+};
+
+// Add a just-closed shift to the rollups; call inside the checkout transaction
+export const recordCheckout = async (tx: Prisma.TransactionClient, shift: Shift) => {
+  const hours = shift.duration || 0;
+  const wages = shift.wage || 0;
+  const date = dayStart(shift.startTime);
+
+  await tx.payrollRollup.upsert({
+    where: {
+      date_employeeId: { date, employeeId: shift.employeeId }
+    },
+    update: {
+      shifts: { increment: 1 },
+      hours: { increment: hours },
+      wages: { increment: wages }
+    },
+    create: { date, employeeId: shift.employeeId, shifts: 1, hours, wages }
+  });
+
+  if (shift.sessionId) {
+    await tx.session.update({
+      where: { id: shift.sessionId },
+      data: { staffCost: { increment: wages } }
+    });
+  }
+};
+
+// Hours and cost so far of running shifts, per employee
+export const liveShiftCosts = async (
+  filter: { from?: Date; to?: Date; sessionId?: string } = {},
+  now = new Date()
+) => {
+  await loadActiveShifts();
+
+  const costs = new Map<string, ShiftCost>();
+  activeShifts.forEach(shift => {
+    if (filter.from && shift.startTime < filter.from) return;
+    if (filter.to && shift.startTime > filter.to) return;
+    if (filter.sessionId && shift.sessionId !== filter.sessionId) return;
+
+    const hours = Math.max(0, now.getTime() - shift.startTime.getTime()) / (1000 * 60 * 60);
+    costs.set(shift.employeeId, { hours, wage: hours * shift.hourlyWage });
+  });
+
+  return costs;
+};
+
+export const totalWage = (costs: Map<string, ShiftCost>) =>
+  Array.from(costs.values()).reduce((sum, cost) => sum + cost.wage, 0);
+
+// Closed shifts per employee for whole days from..to, read from the rollups
+export const payrollByEmployee = async (from: Date, to: Date) => {
+  const groups = await prisma.payrollRollup.groupBy({
+    by: ['employeeId'],
+    where: {
+      date: { gte: dayStart(from), lte: to }
+    },
+    _sum: { shifts: true, hours: true, wages: true }
+  });
+
+  return new Map(groups.map(group => [group.employeeId, {
+    shifts: group._sum.shifts || 0,
+    hours: group._sum.hours || 0,
+    wages: group._sum.wages || 0
+  }]));
+};
+
+// Wages of shifts checked out for one day, plus those still running
+export const staffCostForDay = async (date: Date) => {
+  const [rollups, live] = await Promise.all([
+    prisma.payrollRollup.aggregate({
+      where: { date: dayStart(date) },
+      _sum: { wages: true }
+    }),
+    liveShiftCosts({ from: dayStart(date), to: dayEnd(date) })
+  ]);
+
+  return (rollups._sum.wages || 0) + totalWage(live);
+};
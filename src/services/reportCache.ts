@@ -0,0 +1,115 @@
+import { Prisma, PrismaClient } from '@prisma/client';
+
+const prisma = new PrismaClient();
+
+// Chef reports for fully closed periods are stored in report_cache and served
+// without recomputation. Any write that lands inside a stored period deletes
+// the affected rows again, so the next request recomputes them.
+
+// A period is closed once no session that could still add data to it is
+// active, and it either lies entirely in the past or every day in it has
+// been closed with a DayRecord.
+export const isPeriodClosed = async (startDate: Date, endDate: Date) => {
+  const openSession = await prisma.session.findFirst({
+    where: {
+      isActive: true,
+      startTime: { lte: endDate }
+    },
+    select: { id: true }
+  });
+
+  if (openSession) {
+    return false;
+  }
+
+  if (endDate.getTime() < Date.now()) {
+    return true;
+  }
+
+  const days = Math.round((endDate.getTime() - startDate.getTime()) / (24 * 60 * 60 * 1000));
+  const closedDays = await prisma.dayRecord.count({
+    where: {
+      date: { gte: startDate, lte: endDate }
+    }
+  });
+
+  return closedDays >= days;
+};
+
+// Bumped by every invalidation. A write that lands while a report is being
+// computed must not let that (possibly stale) report be stored: storeReport
+// skips the store if the generation moved since computation started, and
+// removes the row again if it moved during the store. Invalidations only
+// come from this process, so an in-memory counter is enough.
+let generation = 0;
+
+export const cacheGeneration = () => generation;
+
+export const getCachedReport = async <T>(period: string, periodStart: Date) => {
+  const cached = await prisma.reportCache.findUnique({
+    where: {
+      period_periodStart: { period, periodStart }
+    }
+  });
+
+  return cached ? (cached.payload as unknown as T) : null;
+};
+
+export const storeReport = async (
+  period: string,
+  periodStart: Date,
+  periodEnd: Date,
+  report: object,
+  computedAtGeneration: number
+) => {
+  if (generation !== computedAtGeneration) {
+    return;
+  }
+
+  const payload = report as Prisma.InputJsonValue;
+
+  await prisma.reportCache.upsert({
+    where: {
+      period_periodStart: { period, periodStart }
+    },
+    update: { periodEnd, payload, computedAt: new Date() },
+    create: { period, periodStart, periodEnd, payload }
+  });
+
+  if (generation !== computedAtGeneration) {
+    await prisma.reportCache.deleteMany({ where: { period, periodStart } });
+  }
+};
+
+// Drop every stored report whose period contains one of the given timestamps
+export const invalidateReportsAt = async (...timestamps: (Date | null | undefined)[]) => {
+  generation += 1;
+  const points = timestamps.filter((timestamp): timestamp is Date => !!timestamp);
+
+  if (points.length === 0) {
+    return;
+  }
+
+  try {
+    await prisma.reportCache.deleteMany({
+      where: {
+        OR: points.map(point => ({
+          periodStart: { lte: point },
+          periodEnd: { gte: point }
+        }))
+      }
+    });
+  } catch (error) {
+    console.error('Invalidate report cache error:', error);
+  }
+};
+
+// For changes that affect every period (menu prices, names, deleted employees)
+export const invalidateAllReports = async () => {
+  generation += 1;
+  try {
+    await prisma.reportCache.deleteMany({});
+  } catch (error) {
+    console.error('Invalidate report cache error:', error);
+  }
+};
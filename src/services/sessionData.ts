@@ -0,0 +1,60 @@
+import { MenuCategory, MenuItem, Prisma, PrismaClient } from '@prisma/client';
+
+const prisma = new PrismaClient();
+
+// The session new sales, expenses and shifts are stamped with
+export const findActiveSessionId = async (client: Prisma.TransactionClient = prisma) => {
+  const session = await client.session.findFirst({
+    where: { isActive: true },
+    orderBy: { startTime: 'desc' },
+    select: { id: true }
+  });
+
+  return session?.id ?? null;
+};
+
+export interface SalesSummary {
+  totals: { overall: number; cash: number; card: number; itemCount: number };
+  items: { menuItem: MenuItem & { category: MenuCategory }; count: number; revenue: number }[];
+}
+
+// Revenue per payment type and per menu item, aggregated in the database
+export const summarizeSales = async (where: Prisma.SaleWhereInput): Promise<SalesSummary> => {
+  const groups = await prisma.sale.groupBy({
+    by: ['menuItemId', 'paymentType'],
+    where,
+    _sum: { amount: true }
+  });
+
+  const menuItems = await prisma.menuItem.findMany({
+    where: {
+      id: { in: Array.from(new Set(groups.map(group => group.menuItemId))) }
+    },
+    include: { category: true }
+  });
+  const menuItemsById = new Map(menuItems.map(item => [item.id, item]));
+
+  const totals = { overall: 0, cash: 0, card: 0, itemCount: 0 };
+  const items = new Map<string, SalesSummary['items'][number]>();
+
+  groups.forEach(group => {
+    const menuItem = menuItemsById.get(group.menuItemId)!;
+    const count = group._sum.amount || 0;
+    const revenue = menuItem.price * count;
+
+    totals.overall += revenue;
+    totals.itemCount += count;
+    if (group.paymentType === 'CASH') {
+      totals.cash += revenue;
+    } else {
+      totals.card += revenue;
+    }
+
+    const item = items.get(menuItem.id) || { menuItem, count: 0, revenue: 0 };
+    item.count += count;
+    item.revenue += revenue;
+    items.set(menuItem.id, item);
+  });
+
+  return { totals, items: Array.from(items.values()) };
+};